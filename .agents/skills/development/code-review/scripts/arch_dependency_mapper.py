@@ -2,9 +2,14 @@
 """Map import dependencies across Python/JS/TS files and detect architecture violations + circular deps."""
 import argparse
 import ast
+import json
+import os
+import posixpath
 import re
+import subprocess
 import sys
-from collections import defaultdict
+import time
+from collections import defaultdict, deque
 from pathlib import Path
 
 
@@ -25,97 +30,393 @@ VIOLATIONS: dict[str, set[str]] = {
     "domain": {"infrastructure", "application", "ui"},
 }
 
+SOURCE_SUFFIXES = {".py", ".js", ".ts", ".jsx", ".tsx"}
+JS_RESOLVE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+JS_CONFIG_FILES = ("tsconfig.json", "jsconfig.json")
+JSONC_NOISE_RE = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+JSONC_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+# "import time:   self [us] |  cumulative | <indent>module"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\| ( *)(\S.*?)\s*$")
+
+# file (relative to root) -> [(import specifier, line, imported names)]
+ImportIndex = dict[str, list[tuple[str, int, tuple[str, ...]]]]
+
 JS_IMPORT_RE = re.compile(
     r"""(?:import\s+(?:[^'"]+from\s+)?['"]([^'"]+)['"]|require\s*\(\s*['"]([^'"]+)['"]\s*\))""",
     re.MULTILINE,
 )
 
 
+class LayerClassifier:
+    """Substring layer rules compiled into one Aho-Corasick automaton.
+
+    Semantics match a plain scan: the first path part (from the root) that
+    contains any fragment decides the layer, and within a part the fragment
+    listed first wins. Each distinct part is matched once, and results are
+    memoized per path prefix, so a file costs one lookup once its directory
+    has been seen.
+    """
+
+    def __init__(self, layer_map: dict[str, str]):
+        self.layers = list(layer_map.values())
+        self._goto: list[dict[str, int]] = [{}]
+        # Lowest (highest-priority) rule index matched at each state, incl. via failure links.
+        self._best: list[int] = [len(self.layers)]
+        for priority, fragment in enumerate(layer_map):
+            state = 0
+            for ch in fragment.lower():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._best.append(len(self.layers))
+                state = nxt
+            self._best[state] = min(self._best[state], priority)
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._best[nxt] = min(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+        self._part_cache: dict[str, "str | None"] = {}
+        self._prefix_cache: dict[tuple[str, ...], str] = {(): "unknown"}
+
+    def _part_layer(self, part: str) -> "str | None":
+        if part in self._part_cache:
+            return self._part_cache[part]
+        goto, fail, best = self._goto, self._fail, self._best
+        state = 0
+        found = len(self.layers)
+        for ch in part.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        layer = self.layers[found] if found < len(self.layers) else None
+        self._part_cache[part] = layer
+        return layer
+
+    def classify_parts(self, parts: tuple[str, ...]) -> str:
+        hit = self._prefix_cache.get(parts)
+        if hit is None:
+            parent = self.classify_parts(parts[:-1])
+            hit = parent if parent != "unknown" else (self._part_layer(parts[-1]) or "unknown")
+            self._prefix_cache[parts] = hit
+        return hit
+
+    def classify(self, path: Path) -> str:
+        return self.classify_parts(path.parts)
+
+
+_classifier = LayerClassifier(LAYER_MAP)
+
+
 def get_layer(path: Path) -> str:
-    parts = [p.lower() for p in path.parts]
-    for part in parts:
-        for fragment, layer in LAYER_MAP.items():
-            if fragment in part:
-                return layer
-    return "unknown"
+    return _classifier.classify(path)
 
 
-def extract_python_imports(file_path: Path) -> list[str]:
+def load_layer_rules(rules_path: Path):
+    """Replace the layer map and/or forbidden imports from a JSON rule file.
+
+    Format: ``{"layers": {"fragment": "layer", ...}, "violations": {"layer": ["layer", ...]}}``;
+    either key may be omitted to keep the built-in defaults. Fragment order sets priority.
+    """
+    global _classifier, VIOLATIONS
+    try:
+        rules = json.loads(rules_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot read layer rules {rules_path}: {exc}")
+    if "layers" in rules:
+        _classifier = LayerClassifier({str(k).lower(): str(v) for k, v in rules["layers"].items()})
+    if "violations" in rules:
+        VIOLATIONS = {src: set(targets) for src, targets in rules["violations"].items()}
+
+
+def extract_python_imports(file_path: Path) -> list[tuple[str, int, tuple[str, ...]]]:
+    """Return (module, line, names) for every import statement in a Python file.
+
+    Relative imports keep their leading dots (``from ..pkg import x`` →
+    ``..pkg``); ``names`` lists what a ``from`` import pulls in so submodule
+    imports can be resolved.
+    """
     try:
         tree = ast.parse(file_path.read_text(encoding="utf-8", errors="ignore"))
-    except SyntaxError:
+    except (SyntaxError, ValueError, OSError):
         return []
     imports = []
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
             for alias in node.names:
-                imports.append(alias.name)
+                imports.append((alias.name, node.lineno, ()))
         elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                imports.append(node.module)
+            spec = "." * node.level + (node.module or "")
+            imports.append((spec, node.lineno, tuple(alias.name for alias in node.names)))
     return imports
 
 
-def extract_js_imports(file_path: Path) -> list[str]:
+def extract_js_imports(file_path: Path) -> list[tuple[str, int, tuple[str, ...]]]:
+    """Return (specifier, line) for every import/require in a JS/TS file."""
     try:
         content = file_path.read_text(encoding="utf-8", errors="ignore")
     except OSError:
         return []
     results = []
+    line_no = 1
+    last = 0
     for m in JS_IMPORT_RE.finditer(content):
         target = m.group(1) or m.group(2)
         if target:
-            results.append(target)
+            line_no += content.count("\n", last, m.start())
+            last = m.start()
+            results.append((target, line_no, ()))
     return results
 
 
-def collect_graph(root: Path) -> dict[str, list[str]]:
-    graph: dict[str, list[str]] = defaultdict(list)
-    for file_path in root.rglob("*"):
-        if file_path.suffix.lower() == ".py":
-            imports = extract_python_imports(file_path)
-        elif file_path.suffix.lower() in {".js", ".ts", ".jsx", ".tsx"}:
-            imports = extract_js_imports(file_path)
-        else:
+def parse_imports(file_path: Path) -> list[tuple[str, int, tuple[str, ...]]]:
+    if file_path.suffix.lower() == ".py":
+        return extract_python_imports(file_path)
+    return extract_js_imports(file_path)
+
+
+def build_import_index(root: Path) -> ImportIndex:
+    """Parse every source file under root exactly once.
+
+    Maps each file path (relative to root) to its imports; both the
+    dependency graph and the layer check are derived from this index.
+    """
+    index: ImportIndex = {}
+    for file_path in sorted(root.rglob("*")):
+        suffix = file_path.suffix.lower()
+        if suffix not in SOURCE_SUFFIXES or not file_path.is_file():
             continue
-        rel = str(file_path.relative_to(root))
-        for imp in imports:
-            if imp.startswith(".") or (not imp.startswith("@") and "/" in imp):
-                graph[rel].append(imp)
+        index[file_path.relative_to(root).as_posix()] = parse_imports(file_path)
+    return index
+
+
+def scan_sources(root: Path) -> dict[str, tuple[int, int]]:
+    """(mtime_ns, size) for every source file under root, for change polling."""
+    stamps: dict[str, tuple[int, int]] = {}
+    for dirpath, _, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() not in SOURCE_SUFFIXES:
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            stamps[rel] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def _load_jsonc(path: Path) -> dict:
+    """Parse tsconfig-style JSON that may contain comments and trailing commas."""
+    try:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return {}
+    text = JSONC_NOISE_RE.sub(lambda m: m.group(1) or "", text)
+    text = JSONC_TRAILING_COMMA_RE.sub(r"\1", text)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class ModuleResolver:
+    """Map import specifiers to indexed files with memoized O(1) lookups.
+
+    Python: dotted names are indexed from both the root and each package root
+    (first ancestor directory without ``__init__.py``), and relative imports
+    are resolved against the importing file. JS/TS: relative specifiers try
+    extensions and ``index`` files; bare specifiers go through the nearest
+    tsconfig/jsconfig ``paths`` aliases and ``baseUrl``. Unresolvable imports
+    (third-party packages, stdlib) resolve to nothing.
+    """
+
+    def __init__(self, root: Path, files):
+        self.root = root
+        self.files = set(files)
+        self.py_modules: dict[str, str] = {}
+        self._cache: dict[tuple, tuple[str, ...]] = {}
+        self._configs: dict[str, tuple] = {}
+        for rel in sorted(self.files, key=lambda f: (f.count("/"), f)):
+            if rel.endswith(".py"):
+                self._index_python(rel)
+
+    def _index_python(self, rel: str):
+        parts = rel[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts.pop()
+        if not parts:
+            return
+        self.py_modules.setdefault(".".join(parts), rel)
+        # Walk up while the parent directory is a package to find the import root.
+        depth = len(parts) - 1
+        while depth > 0 and "/".join(parts[:depth]) + "/__init__.py" in self.files:
+            depth -= 1
+        if depth > 0:
+            self.py_modules.setdefault(".".join(parts[depth:]), rel)
+
+    def resolve(self, src: str, spec: str, names: tuple[str, ...] = ()) -> tuple[str, ...]:
+        if src.endswith(".py"):
+            relative = spec.startswith(".")
+            key = (posixpath.dirname(src) if relative else None, spec, names)
+        else:
+            key = (posixpath.dirname(src), spec)
+        hit = self._cache.get(key)
+        if hit is None:
+            hit = self._resolve_python(src, spec, names) if src.endswith(".py") else self._resolve_js(src, spec)
+            self._cache[key] = hit
+        return hit
+
+    # ---- Python ----
+
+    def _python_file(self, base: str) -> "str | None":
+        for candidate in (f"{base}.py", f"{base}/__init__.py"):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _resolve_python(self, src: str, spec: str, names: tuple[str, ...]) -> tuple[str, ...]:
+        module = spec.lstrip(".")
+        level = len(spec) - len(module)
+        if level:
+            base = posixpath.dirname(src)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            if module:
+                base = posixpath.join(base, module.replace(".", "/"))
+            found = [t for t in (self._python_file(posixpath.join(base, n)) for n in names) if t]
+            if not found:
+                package = self._python_file(base) if base else "__init__.py" if "__init__.py" in self.files else None
+                found = [package] if package else []
+            return tuple(dict.fromkeys(found))
+
+        found = [self.py_modules[f"{module}.{n}"] for n in names if f"{module}.{n}" in self.py_modules]
+        if found:
+            return tuple(dict.fromkeys(found))
+        while module:
+            if module in self.py_modules:
+                return (self.py_modules[module],)
+            module = module.rpartition(".")[0]
+        return ()
+
+    # ---- JS / TS ----
+
+    def _js_file(self, base: str) -> "str | None":
+        base = posixpath.normpath(base)
+        if base.startswith("../"):
+            return None
+        candidates = [base]
+        stem, ext = posixpath.splitext(base)
+        if ext in {".js", ".jsx", ".mjs", ".cjs"}:
+            candidates += [stem + ".ts", stem + ".tsx"]
+        candidates += [base + e for e in JS_RESOLVE_EXTENSIONS]
+        candidates += [f"{base}/index{e}" for e in JS_RESOLVE_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _js_config(self, directory: str) -> tuple:
+        """(base_dir, [(prefix, suffix, targets)]) from the nearest tsconfig/jsconfig."""
+        cached = self._configs.get(directory)
+        if cached is not None:
+            return cached
+        config = None
+        for name in JS_CONFIG_FILES:
+            path = self.root / directory / name
+            if path.is_file():
+                options = _load_jsonc(path).get("compilerOptions") or {}
+                base = posixpath.normpath(posixpath.join(directory, options.get("baseUrl") or "."))
+                aliases = []
+                for pattern, targets in (options.get("paths") or {}).items():
+                    prefix, star, suffix = pattern.partition("*")
+                    aliases.append((prefix, suffix if star else None, list(targets)))
+                aliases.sort(key=lambda a: len(a[0]), reverse=True)
+                config = (base if base != "." else "", aliases, "baseUrl" in options)
+                break
+        if config is None:
+            config = self._js_config(posixpath.dirname(directory)) if directory else ("", [], False)
+        self._configs[directory] = config
+        return config
+
+    def _resolve_js(self, src: str, spec: str) -> tuple[str, ...]:
+        src_dir = posixpath.dirname(src)
+        if spec.startswith((".", "/")):
+            if spec.startswith("/"):
+                return ()
+            target = self._js_file(posixpath.join(src_dir, spec))
+            return (target,) if target else ()
+        base, aliases, has_base_url = self._js_config(src_dir)
+        for prefix, suffix, targets in aliases:
+            if suffix is None:
+                if spec != prefix:
+                    continue
+                wildcard = ""
+            elif spec.startswith(prefix) and spec.endswith(suffix) and len(spec) >= len(prefix) + len(suffix):
+                wildcard = spec[len(prefix):len(spec) - len(suffix)]
+            else:
+                continue
+            for pattern in targets:
+                target = self._js_file(posixpath.join(base, pattern.replace("*", wildcard)))
+                if target:
+                    return (target,)
+        if has_base_url:
+            target = self._js_file(posixpath.join(base, spec))
+            if target:
+                return (target,)
+        return ()
+
+
+def collect_graph(index: ImportIndex, resolver: ModuleResolver) -> dict[str, list[str]]:
+    """File-level dependency graph; every edge points at an indexed file."""
+    graph: dict[str, list[str]] = {}
+    for rel, imports in index.items():
+        targets: dict[str, None] = {}
+        for imp, _, names in imports:
+            for target in resolver.resolve(rel, imp, names):
+                targets[target] = None
+        graph[rel] = list(targets)
     return graph
 
 
-def detect_layer_violations(root: Path) -> list[dict]:
-    findings = []
-    for file_path in root.rglob("*"):
-        if file_path.suffix.lower() == ".py":
-            imports = extract_python_imports(file_path)
-        elif file_path.suffix.lower() in {".js", ".ts", ".jsx", ".tsx"}:
-            imports = extract_js_imports(file_path)
-        else:
-            continue
+def layer_path(root: Path, rel: str) -> Path:
+    """Path used for layer classification: the scanned directory's own name plus the relative path.
 
-        src_layer = get_layer(file_path)
-        forbidden = VIOLATIONS.get(src_layer, set())
-        if not forbidden:
-            continue
+    Ancestors of the scan root are ignored so that e.g. a checkout under
+    ``/home/guido`` is not classified as UI.
+    """
+    return Path(root.resolve().name) / rel
 
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
-        except OSError:
-            continue
-        lines = content.splitlines()
-
-        for imp in imports:
-            imp_layer = get_layer(Path(imp.replace(".", "/").replace("@", "")))
-            if imp_layer in forbidden:
-                line_no = 1
-                for i, line in enumerate(lines, 1):
-                    if imp in line:
-                        line_no = i
-                        break
+
+def file_layer_violations(root: Path, rel: str, imports, resolver: ModuleResolver) -> list[dict]:
+    src_layer = get_layer(layer_path(root, rel))
+    forbidden = VIOLATIONS.get(src_layer, set())
+    findings = []
+    if forbidden:
+        for imp, line_no, names in imports:
+            targets = resolver.resolve(rel, imp, names)
+            if targets:
+                layers = [get_layer(layer_path(root, t)) for t in targets]
+            else:
+                layers = [get_layer(Path(imp.replace(".", "/").replace("@", "")))]
+            imp_layer = next((layer for layer in layers if layer in forbidden), None)
+            if imp_layer:
                 findings.append({
-                    "file": str(file_path),
+                    "file": str(root / rel),
                     "line": line_no,
                     "src_layer": src_layer,
                     "target_layer": imp_layer,
@@ -124,38 +425,397 @@ def detect_layer_violations(root: Path) -> list[dict]:
     return findings
 
 
-def detect_circular(graph: dict[str, list[str]]) -> list[list[str]]:
-    cycles = []
-    visited: set[str] = set()
-    path: list[str] = []
-    path_set: set[str] = set()
+def detect_layer_violations(root: Path, index: ImportIndex, resolver: ModuleResolver) -> list[dict]:
+    findings = []
+    for rel, imports in index.items():
+        findings.extend(file_layer_violations(root, rel, imports, resolver))
+    return findings
 
-    def dfs(node: str):
-        if node in path_set:
-            cycle_start = path.index(node)
-            cycles.append(path[cycle_start:] + [node])
-            return
-        if node in visited:
-            return
-        visited.add(node)
-        path.append(node)
-        path_set.add(node)
-        for neighbour in graph.get(node, []):
-            dfs(neighbour)
-        path.pop()
-        path_set.discard(node)
-
-    for node in list(graph.keys()):
-        dfs(node)
-
-    seen: set[frozenset] = set()
-    unique = []
-    for c in cycles:
-        key = frozenset(c)
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-    return unique[:10]
+
+def find_sccs(graph: dict[str, list[str]]) -> list[list[str]]:
+    """Iterative Tarjan: strongly connected components that contain a cycle.
+
+    Runs in O(V + E) without recursion, so deep import chains cannot hit the
+    interpreter's recursion limit. Single nodes are reported only when they
+    import themselves.
+    """
+    index_of: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    sccs: list[list[str]] = []
+
+    for root in graph:
+        if root in index_of:
+            continue
+        index_of[root] = low[root] = len(index_of)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            node, neighbours = work[-1]
+            for nxt in neighbours:
+                if nxt not in index_of:
+                    index_of[nxt] = low[nxt] = len(index_of)
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(graph.get(nxt, ()))))
+                    break
+                if nxt in on_stack and index_of[nxt] < low[node]:
+                    low[node] = index_of[nxt]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] != index_of[node]:
+                    continue
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in graph.get(node, ()):
+                    sccs.append(component)
+    return sccs
+
+
+def shortest_cycles(graph: dict[str, list[str]], members: list[str], limit: int) -> list[list[str]]:
+    """Up to `limit` distinct shortest cycles inside one SCC, via BFS from its members."""
+    if limit <= 0:
+        return []
+    inside = set(members)
+    cycles: list[list[str]] = []
+    seen: set[tuple[str, ...]] = set()
+    for start in sorted(members)[:limit * 4]:
+        parent: dict[str, str] = {}
+        queue = deque([start])
+        found = None
+        while queue and found is None:
+            node = queue.popleft()
+            for nxt in graph.get(node, ()):
+                if nxt == start:
+                    found = node
+                    break
+                if nxt in inside and nxt not in parent:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        if found is None:
+            continue
+        path = [found]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        pivot = path.index(min(path))
+        key = tuple(path[pivot:] + path[:pivot])
+        if key in seen:
+            continue
+        seen.add(key)
+        cycles.append(path + [start])
+        if len(cycles) >= limit:
+            break
+    return cycles
+
+
+def detect_circular(graph: dict[str, list[str]], cycles_per_scc: int = 1) -> list[dict]:
+    """Every cyclic SCC (largest first) with its size and representative shortest cycles."""
+    results = []
+    for component in find_sccs(graph):
+        results.append({
+            "size": len(component),
+            "members": sorted(component),
+            "cycles": shortest_cycles(graph, component, cycles_per_scc),
+        })
+    results.sort(key=lambda r: (-r["size"], r["members"][0]))
+    return results
+
+
+# ---------- Import-time overlay ----------
+
+def parse_importtime(log_path: Path) -> list[dict]:
+    """Rebuild the import tree from ``python -X importtime`` output.
+
+    The log lists each module after everything it imported (post-order),
+    indented two spaces per nesting level, so children are collected per
+    level until their parent's line arrives. Returns the top-level nodes.
+    """
+    pending: dict[int, list[dict]] = defaultdict(list)
+    try:
+        handle = open(log_path, "r", encoding="utf-8", errors="ignore")
+    except OSError as exc:
+        raise SystemExit(f"Cannot read import-time log {log_path}: {exc}")
+    with handle:
+        for line in handle:
+            m = IMPORTTIME_RE.match(line)
+            if not m:
+                continue
+            level = len(m.group(3)) // 2
+            node = {
+                "module": m.group(4),
+                "self_us": int(m.group(1)),
+                "cum_us": int(m.group(2)),
+                "children": pending.pop(level + 1, []),
+                "parent": None,
+            }
+            for child in node["children"]:
+                child["parent"] = node
+            pending[level].append(node)
+    return pending.get(0, [])
+
+
+def importtime_report(roots: list[dict], resolver: ModuleResolver, graph: dict[str, list[str]], top: int) -> dict:
+    """Attach import cost to graph nodes and rank chains, modules and the entry points behind them."""
+    nodes: list[dict] = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        node["file"] = resolver.py_modules.get(node["module"])
+        nodes.append(node)
+        stack.extend(node["children"])
+
+    chains = []
+    for root in sorted(roots, key=lambda n: n["cum_us"], reverse=True)[:top]:
+        chain = [root]
+        while chain[-1]["children"]:
+            chain.append(max(chain[-1]["children"], key=lambda n: n["cum_us"]))
+        chains.append({"cum_us": root["cum_us"], "modules": [n["module"] for n in chain]})
+
+    def pulled_in_by(node: dict) -> tuple:
+        """(nearest, outermost) in-tree modules on the import path that led to node."""
+        nearest = outermost = None
+        while node is not None:
+            if node["file"]:
+                nearest = nearest or node["module"]
+                outermost = node["module"]
+            node = node["parent"]
+        return nearest, outermost
+
+    slowest = []
+    for n in sorted(nodes, key=lambda n: n["self_us"], reverse=True)[:top]:
+        via, entry = pulled_in_by(n["parent"])
+        slowest.append({"module": n["module"], "self_us": n["self_us"], "cum_us": n["cum_us"],
+                        "via": via, "entry_point": entry})
+
+    reverse: dict[str, list[str]] = defaultdict(list)
+    for src, targets in graph.items():
+        for target in targets:
+            reverse[target].append(src)
+    in_tree = []
+    for n in sorted((n for n in nodes if n["file"]), key=lambda n: n["cum_us"], reverse=True)[:top]:
+        upstream = _reachable(reverse, n["file"])
+        entry_points = sorted(f for f in upstream if not reverse.get(f))
+        in_tree.append({
+            "module": n["module"],
+            "file": n["file"],
+            "self_us": n["self_us"],
+            "cum_us": n["cum_us"],
+            "entry_points": entry_points,
+        })
+
+    return {
+        "total_us": sum(r["cum_us"] for r in roots),
+        "chains": chains,
+        "slowest": slowest,
+        "in_tree": in_tree,
+    }
+
+
+def print_importtime(report: dict):
+    print(f"⏱️  IMPORT TIME (total {report['total_us'] / 1000:.1f} ms):")
+    if not report["chains"]:
+        print("  No import-time records found.")
+        return
+    print("  Heaviest import chains:")
+    for chain in report["chains"]:
+        print(f"    {chain['cum_us'] / 1000:8.1f} ms  {' → '.join(chain['modules'])}")
+    print("  Slowest modules (self time):")
+    for m in report["slowest"]:
+        via = ""
+        if m["via"]:
+            via = f"  ← imported by {m['via']}"
+            if m["entry_point"] != m["via"]:
+                via += f" (entry point: {m['entry_point']})"
+        print(f"    {m['self_us'] / 1000:8.1f} ms  {m['module']}{via}")
+    if report["in_tree"]:
+        print("  In-tree modules by cumulative import time:")
+        for m in report["in_tree"]:
+            entries = ", ".join(m["entry_points"][:5]) or m["file"]
+            more = f" (+{len(m['entry_points']) - 5} more)" if len(m["entry_points"]) > 5 else ""
+            print(f"    {m['cum_us'] / 1000:8.1f} ms cum / {m['self_us'] / 1000:.1f} ms self  "
+                  f"{m['file']}  ← entry points: {entries}{more}")
+
+
+def git_changed_files(ref: str, cwd: Path) -> set[Path]:
+    """Absolute paths of files added or modified since the merge base of ref and HEAD.
+
+    Includes committed, staged and unstaged edits plus untracked files, so the
+    same scope works in CI and in a local working tree.
+    """
+    def git(*args: str) -> str:
+        result = subprocess.run(["git", "-C", str(cwd), *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    top = Path(git("rev-parse", "--show-toplevel").strip())
+    base = git("merge-base", ref, "HEAD").strip()
+    names = git("diff", "--name-only", "--diff-filter=d", base).splitlines()
+    names += git("ls-files", "--others", "--exclude-standard", "--full-name").splitlines()
+    return {(top / name).resolve() for name in names if name}
+
+
+def changed_scope(root: Path, ref: str, graph: dict[str, list[str]]) -> tuple[set[str], set[str]]:
+    """(changed files, changed files plus their direct importers), relative to root."""
+    resolved_root = root.resolve()
+    changed = {
+        path.relative_to(resolved_root).as_posix()
+        for path in git_changed_files(ref, root)
+        if path.is_relative_to(resolved_root)
+    }
+    changed &= graph.keys()
+    scope = set(changed)
+    for src, targets in graph.items():
+        if src not in scope and any(t in changed for t in targets):
+            scope.add(src)
+    return changed, scope
+
+
+def _reachable(graph: dict, start: str) -> set[str]:
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for nxt in graph.get(queue.popleft(), ()):
+            if nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    return seen
+
+
+def _violation_key(v: dict) -> tuple:
+    return (v["file"], v["line"], v["import"], v["target_layer"])
+
+
+class WatchSession:
+    """Keep the import graph in memory and re-check only what a change can affect.
+
+    Changes are found by polling file mtimes and sizes. Edited files are the
+    only ones re-parsed; for pure edits, layer checks rerun for those files
+    and SCCs are recomputed only inside the region that can have changed: the
+    old components of the edited files plus the nodes that now share a cycle
+    with them. Adding or removing files can change how unchanged files'
+    imports resolve, so that case re-resolves every edge (still without
+    re-parsing) and recomputes all components.
+    """
+
+    def __init__(self, root: Path, index: ImportIndex, check_violations: bool, check_circular: bool):
+        self.root = root
+        self.index = index
+        self.check_violations = check_violations
+        self.check_circular = check_circular
+        self.stamps = scan_sources(root)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.resolver = ModuleResolver(self.root, self.index)
+        self.graph = collect_graph(self.index, self.resolver)
+        self.reverse: dict[str, set[str]] = defaultdict(set)
+        for src, targets in self.graph.items():
+            for target in targets:
+                self.reverse[target].add(src)
+        self.violations = {}
+        if self.check_violations:
+            for rel, imports in self.index.items():
+                self.violations[rel] = file_layer_violations(self.root, rel, imports, self.resolver)
+        self.sccs: set[frozenset] = set()
+        if self.check_circular:
+            self.sccs = {frozenset(c) for c in find_sccs(self.graph)}
+
+    def _update_edges(self, rel: str):
+        for target in self.graph.get(rel, ()):
+            self.reverse[target].discard(rel)
+        targets: dict[str, None] = {}
+        for imp, _, names in self.index[rel]:
+            for target in self.resolver.resolve(rel, imp, names):
+                targets[target] = None
+        self.graph[rel] = list(targets)
+        for target in self.graph[rel]:
+            self.reverse[target].add(rel)
+
+    def _recompute_sccs(self, changed: set[str]):
+        old_of = {node: scc for scc in self.sccs for node in scc if node in changed}
+        region: set[str] = set()
+        for node in changed:
+            region |= old_of.get(node, {node})
+            region |= _reachable(self.graph, node) & _reachable(self.reverse, node)
+        sub = {node: [t for t in self.graph.get(node, ()) if t in region] for node in region}
+        kept = {scc for scc in self.sccs if not (scc & region)}
+        self.sccs = kept | {frozenset(c) for c in find_sccs(sub)}
+
+    def poll(self):
+        """Apply on-disk changes; return (changed files, added violations, resolved violations, new SCCs, gone SCCs)."""
+        stamps = scan_sources(self.root)
+        changed = {rel for rel, stamp in stamps.items() if self.stamps.get(rel) != stamp}
+        removed = set(self.stamps) - set(stamps)
+        self.stamps = stamps
+        if not changed and not removed:
+            return None
+
+        before_violations = {_violation_key(v): v for vs in self.violations.values() for v in vs}
+        before_sccs = set(self.sccs)
+        for rel in changed:
+            self.index[rel] = parse_imports(self.root / rel)
+        for rel in removed:
+            self.index.pop(rel, None)
+
+        if removed or any(rel not in self.graph for rel in changed):
+            self._rebuild()
+        else:
+            for rel in changed:
+                self._update_edges(rel)
+                if self.check_violations:
+                    self.violations[rel] = file_layer_violations(self.root, rel, self.index[rel], self.resolver)
+            if self.check_circular:
+                self._recompute_sccs(changed)
+
+        after_violations = {_violation_key(v): v for vs in self.violations.values() for v in vs}
+        return (
+            sorted(changed | removed),
+            [after_violations[k] for k in after_violations.keys() - before_violations.keys()],
+            [before_violations[k] for k in before_violations.keys() - after_violations.keys()],
+            [sorted(c) for c in self.sccs - before_sccs],
+            [sorted(c) for c in before_sccs - self.sccs],
+        )
+
+    def run(self, interval: float):
+        print(f"\n👀 Watching {self.root} for changes (Ctrl+C to stop)...")
+        try:
+            while True:
+                time.sleep(interval)
+                started = time.perf_counter()
+                result = self.poll()
+                if result is None:
+                    continue
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                files, added, resolved, new_sccs, gone_sccs = result
+                print(f"\n[{time.strftime('%H:%M:%S')}] {len(files)} file(s) changed, "
+                      f"re-checked in {elapsed_ms:.1f} ms")
+                for v in added:
+                    print(f"  🚨 new [{v['src_layer'].upper()} → {v['target_layer'].upper()}] "
+                          f"{v['file']}:{v['line']}  import: {v['import']}")
+                for v in resolved:
+                    print(f"  ✅ resolved [{v['src_layer'].upper()} → {v['target_layer'].upper()}] "
+                          f"{v['file']}:{v['line']}  import: {v['import']}")
+                for members in new_sccs:
+                    print(f"  ♻️  new cycle (size {len(members)}): {', '.join(members[:10])}")
+                for members in gone_sccs:
+                    print(f"  ✅ cycle broken (size {len(members)}): {', '.join(members[:10])}")
+                total = sum(len(vs) for vs in self.violations.values()) + len(self.sccs)
+                print(f"  Total issues: {total}")
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
 
 
 def main():
@@ -165,18 +825,49 @@ def main():
     parser.add_argument("target", help="Source directory to analyze")
     parser.add_argument("--no-violations", action="store_true", help="Skip layer violation check")
     parser.add_argument("--no-circular", action="store_true", help="Skip circular dependency check")
+    parser.add_argument("--cycles-per-scc", type=int, default=1,
+                        help="Representative shortest cycles to list per cyclic component (default: 1, 0 = none)")
+    parser.add_argument("--layer-rules", default=None,
+                        help='JSON file with {"layers": {fragment: layer}, "violations": {layer: [layers]}}')
+    parser.add_argument("--importtime", default=None, metavar="LOG",
+                        help="stderr of `python -X importtime ...`; overlays import cost on the graph")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Rows per import-time ranking (default: 10)")
+    parser.add_argument("--since", default=None, metavar="GIT_REF",
+                        help="Only report issues touching files changed since the merge base with GIT_REF, "
+                             "plus the files that import them")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the first report, keep polling for changes and report new/resolved issues")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Polling interval in seconds for --watch (default: 0.5)")
     args = parser.parse_args()
 
     root = Path(args.target)
     if not root.exists():
         raise SystemExit(f"Target does not exist: {root}")
+    if args.layer_rules:
+        load_layer_rules(Path(args.layer_rules))
 
     print("🕸️  Architecture Dependency Mapper")
     print(f"Scanning: {root}\n")
 
-    violations = [] if args.no_violations else detect_layer_violations(root)
-    graph = {} if args.no_circular else collect_graph(root)
-    cycles = [] if args.no_circular else detect_circular(graph)
+    index = build_import_index(root)
+    resolver = ModuleResolver(root, index)
+    needs_graph = not args.no_circular or args.importtime or args.since
+    graph = collect_graph(index, resolver) if needs_graph else {}
+    if args.since:
+        changed, scope = changed_scope(root, args.since, graph)
+        print(f"Scope: {len(changed)} changed file(s) since {args.since} "
+              f"(+{len(scope) - len(changed)} importer(s))\n")
+        scoped_index = {rel: index[rel] for rel in sorted(scope)}
+        violations = [] if args.no_violations else detect_layer_violations(root, scoped_index, resolver)
+        cycles = [] if args.no_circular else [
+            scc for scc in detect_circular(graph, args.cycles_per_scc)
+            if not changed.isdisjoint(scc["members"])
+        ]
+    else:
+        violations = [] if args.no_violations else detect_layer_violations(root, index, resolver)
+        cycles = [] if args.no_circular else detect_circular(graph, args.cycles_per_scc)
 
     if violations:
         print(f"🚨 LAYER VIOLATIONS ({len(violations)} found):")
@@ -189,14 +880,26 @@ def main():
     print()
 
     if cycles:
-        print(f"♻️  CIRCULAR DEPENDENCIES ({len(cycles)} found):")
-        for cycle in cycles:
-            print(f"  {' → '.join(cycle)}")
+        print(f"♻️  CIRCULAR DEPENDENCIES ({len(cycles)} cyclic components):")
+        for i, scc in enumerate(cycles, 1):
+            members = scc["members"]
+            shown = ", ".join(members[:10])
+            more = f" … (+{len(members) - 10} more)" if len(members) > 10 else ""
+            print(f"  SCC {i} (size {scc['size']}): {shown}{more}")
+            for cycle in scc["cycles"]:
+                print(f"    {' → '.join(cycle)}")
     else:
         print("✅ No circular dependencies detected.")
 
+    if args.importtime:
+        print()
+        print_importtime(importtime_report(parse_importtime(Path(args.importtime)), resolver, graph, args.top))
+
     total_issues = len(violations) + len(cycles)
     print(f"\nTotal issues: {total_issues}")
+    if args.watch:
+        WatchSession(root, index, not args.no_violations, not args.no_circular).run(args.interval)
+        return
     sys.exit(1 if total_issues > 0 else 0)
 
 
@@ -2,41 +2,78 @@
 """Cyclomatic complexity analyzer for Python and JS/TS files."""
 import argparse
 import ast
+import hashlib
+import json
+import os
+import pstats
 import re
+import subprocess
 import sys
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 
 GOD_METHOD_LINES = 60
-
-JS_BRANCH_RE = re.compile(
-    r"\b(if|else\s+if|else|for|while|switch|case|catch)\b|&&|\|\||\?"
-)
-JS_METHOD_RE = re.compile(
-    r"""(?:(?:async\s+)?function\s*\*?\s*(\w+)\s*\([^)]*\)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>)|\b(\w+)\s*\([^)]*\)\s*\{)"""
+SOURCE_SUFFIXES = {".py", ".js", ".ts", ".jsx", ".tsx"}
+# Bump whenever analysis output changes so stale cache entries are never reused.
+ANALYZER_VERSION = "3"
+CACHE_MAX_MB = 256
+
+# py-spy style collapsed frame: "func (path/to/file.py:123)"
+COLLAPSED_FRAME_RE = re.compile(r"^(?P<name>.+?) \((?P<file>[^()]+?)(?::(?P<line>\d+))?\)$")
+HOTSPOT_TOP = 20
+PROFILE_SNIFF_BYTES = 64 * 1024
+
+JS_TOKEN_RE = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<string>'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?)
+    | (?P<name>(?:[^\W\d]|\$)[\w$]*)
+    | (?P<number>\.?\d[\w.]*)
+    | (?P<punct>=>|\?\?=?|\?\.(?!\d)|&&=?|\|\|=?|\.\.\.|[^\s\w])
+    """,
+    re.DOTALL | re.VERBOSE,
 )
+JS_TEMPLATE_CHUNK_RE = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.DOTALL)
+JS_REGEX_LITERAL_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+JS_TERNARY_FOLLOW_RE = re.compile(r"\s*[:),;=]")
+
+JS_BRANCH_KEYWORDS = {"if", "else", "for", "while", "switch", "case", "catch"}
+JS_BRANCH_OPERATORS = {"&&", "||", "??", "&&=", "||=", "??="}
+JS_BLOCK_KEYWORDS = {"if", "for", "while", "switch", "catch", "with"}
+# A `{` after one of these inside a TS return annotation opens a type literal, not the body.
+JS_TYPE_LITERAL_PREFIXES = {":", "<", ",", "|", "&", "(", "["}
+# Punctuation after which `/` divides (or, for `<`, closes a JSX tag) rather than starts a regex.
+JS_NO_REGEX_AFTER = {")", "]", "}", "<"}
+# Tokens that can precede the parameter list of an arrow function.
+JS_ARROW_PARAM_PREFIXES = {"=", ":", "(", ",", "=>", "async", "return", "&&", "||", "??"}
+# A `/` after one of these starts a regex literal rather than a division.
+JS_REGEX_PREFIX_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+}
 
 
 # ---------- Python AST visitor ----------
 
 class ComplexityVisitor(ast.NodeVisitor):
-    BRANCH_NODES = (
-        ast.If, ast.For, ast.While, ast.ExceptHandler,
-        ast.With, ast.AsyncWith, ast.AsyncFor,
-    )
+    """Per-function cyclomatic complexity in a single traversal.
+
+    A stack of open functions receives each branch as it is visited, so a
+    nested function's branches count toward that function only and every
+    node is visited exactly once. Decorators, argument defaults and return
+    annotations run in the enclosing scope and count there. Lambdas are not
+    scopes of their own.
+    """
 
     def __init__(self, source_lines: list[str]):
         self.source_lines = source_lines
         self.findings: list[dict] = []
-
-    def _count_branches(self, node) -> int:
-        count = 1
-        for child in ast.walk(node):
-            if isinstance(child, self.BRANCH_NODES):
-                count += 1
-            elif isinstance(child, ast.BoolOp):
-                count += len(child.values) - 1
-        return count
+        self._stack: list[dict] = []
 
     def _func_body_lines(self, node) -> int:
         if not node.body:
@@ -45,76 +82,290 @@ class ComplexityVisitor(ast.NodeVisitor):
         last = getattr(node.body[-1], "end_lineno", node.body[-1].lineno)
         return last - first + 1
 
-    def _analyze_func(self, node):
-        cc = self._count_branches(node)
-        body_lines = self._func_body_lines(node)
+    def _visit_func(self, node):
         snippet = ""
         if node.lineno <= len(self.source_lines):
             snippet = self.source_lines[node.lineno - 1].strip()
-        self.findings.append({
+        finding = {
             "name": node.name,
             "line": node.lineno,
-            "complexity": cc,
-            "body_lines": body_lines,
+            "complexity": 1,
+            "body_lines": self._func_body_lines(node),
             "snippet": snippet,
-        })
-
-    def visit_FunctionDef(self, node):
-        self._analyze_func(node)
+        }
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self.findings.append(finding)
+        self._stack.append(finding)
+        for stmt in node.body:
+            self.visit(stmt)
+        self._stack.pop()
+
+    def _visit_branch(self, node):
+        if self._stack:
+            self._stack[-1]["complexity"] += 1
         self.generic_visit(node)
 
-    def visit_AsyncFunctionDef(self, node):
-        self._analyze_func(node)
+    def visit_BoolOp(self, node):
+        if self._stack:
+            self._stack[-1]["complexity"] += len(node.values) - 1
         self.generic_visit(node)
 
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_func
+    visit_If = visit_For = visit_While = visit_ExceptHandler = _visit_branch
+    visit_With = visit_AsyncWith = visit_AsyncFor = _visit_branch
+
+
+# ---------- JS/TS analysis (single-pass tokenizer) ----------
+
+def _skip_generics(toks: list, j: int) -> int:
+    """If toks[j] closes a `<...>` type parameter list, return the index just before it."""
+    if j < 0 or toks[j][1] != ">":
+        return j
+    depth = 0
+    for k in range(j, max(j - 64, -1), -1):
+        text = toks[k][1]
+        if text == ">":
+            depth += 1
+        elif text == "<":
+            depth -= 1
+            if depth == 0:
+                return k - 1
+    return j
+
+
+def _binding_name(toks: list, j: int):
+    """Name bound by `name = <fn>` / `name: <fn>` ending at toks[j], else None."""
+    if j >= 1 and toks[j][1] in {"=", ":"} and toks[j - 1][0] == "name":
+        return toks[j - 1]
+    return None
+
+
+def _head_from_paren(toks: list, close_idx: int):
+    """Classify the `( ... )` closing at close_idx as a function head.
+
+    Returns (name, start_token) or None when the parens belong to a control
+    statement or plain expression.
+    """
+    open_idx = toks[close_idx][3]
+    j = _skip_generics(toks, open_idx - 1)
+    if j < 0:
+        return None
+    kind, text = toks[j][0], toks[j][1]
+    if text == "*":
+        j -= 1
+        if j < 0:
+            return None
+        kind, text = toks[j][0], toks[j][1]
+    if kind != "name":
+        if text == "]":
+            return "<anonymous>", toks[j]
+        return None
+    if text in JS_BLOCK_KEYWORDS:
+        return None
+    if text == "await" and j >= 1 and toks[j - 1][1] == "for":
+        return None
+    if text == "function":
+        bound = _binding_name(toks, j - 1)
+        return (bound[1], bound) if bound else ("<anonymous>", toks[j])
+    return text, toks[j]
+
+
+def _is_arrow_params(toks: list, close_idx: int) -> bool:
+    """Whether the `( ... )` closing at close_idx can be an arrow parameter list."""
+    j = _skip_generics(toks, toks[close_idx][3] - 1)
+    return j >= 0 and toks[j][1] in JS_ARROW_PARAM_PREFIXES
+
+
+def _head_from_arrow(toks: list, arrow_idx: int, params_close: int):
+    """Classify an arrow function whose `=>` sits at arrow_idx.
+
+    params_close is the `)` of a signature followed by a TS return type
+    annotation; the annotation between it and the `=>` is skipped.
+    """
+    j = arrow_idx - 1
+    if params_close >= 0:
+        j = params_close
+    if j < 0:
+        return None
+    if toks[j][1] == ")":
+        j = _skip_generics(toks, toks[j][3] - 1)
+    elif toks[j][0] == "name":
+        j -= 1
+    else:
+        return None
+    start = toks[j + 1]
+    if j >= 0 and toks[j][1] == "async":
+        start = toks[j]
+        j -= 1
+    bound = _binding_name(toks, j)
+    return (bound[1], bound) if bound else ("<anonymous>", start)
+
+
+def analyze_js_source(content: str) -> list[dict]:
+    """Report every JS/TS function body with its own branch count in one sweep.
+
+    Strings, comments, template literals and regex literals are skipped by the
+    tokenizer, so braces inside them never disturb extents. Branches are
+    credited to the innermost enclosing function only.
+    """
+    line_starts = [0]
+    line_starts.extend(m.end() for m in re.finditer("\n", content))
+
+    def line_of(pos: int) -> int:
+        return bisect_right(line_starts, pos)
+
+    def snippet_of(line_no: int) -> str:
+        end = line_starts[line_no] if line_no < len(line_starts) else len(content)
+        return content[line_starts[line_no - 1]:end].strip()
+
+    findings: list[dict] = []
+    toks: list[tuple] = []          # (kind, text, pos, matching-open-paren-index)
+    paren_stack: list[int] = []
+    brace_stack: list = []          # finding dict for function bodies, "template" or None
+    func_stack: list[dict] = []
+    brace_lines: list[int] = []
+    # `)` index of a signature awaiting its body past a TS return type annotation.
+    pending_sig = -1
+    pending_depth = (-1, -1)
+    size = len(content)
+    pos = 0
+    in_template = False
+
+    while pos < size:
+        if in_template:
+            pos = JS_TEMPLATE_CHUNK_RE.match(content, pos).end()
+            if pos >= size:
+                break
+            if content[pos] == "`":
+                in_template = False
+                toks.append(("template", "`", pos, -1))
+                pos += 1
+            elif content.startswith("${", pos):
+                in_template = False
+                brace_stack.append("template")
+                brace_lines.append(0)
+                toks.append(("punct", "${", pos, -1))
+                pos += 2
+            else:
+                pos += 1
+            continue
+
+        ch = content[pos]
+        if ch == "`":
+            in_template = True
+            pos += 1
+            continue
+        if ch == "/" and content[pos + 1:pos + 2] not in {"/", "*"}:
+            prev = toks[-1] if toks else None
+            if (prev is None
+                    or (prev[0] == "name" and prev[1] in JS_REGEX_PREFIX_KEYWORDS)
+                    or (prev[0] == "punct" and prev[1] not in JS_NO_REGEX_AFTER)):
+                m = JS_REGEX_LITERAL_RE.match(content, pos)
+                if m:
+                    toks.append(("regex", m.group(0), pos, -1))
+                    pos = m.end()
+                    continue
+
+        m = JS_TOKEN_RE.match(content, pos)
+        kind = m.lastgroup
+        pos = m.end()
+        if kind in {"space", "comment"}:
+            continue
+        text = m.group(0)
+        start = m.start()
+
+        if kind == "name":
+            if text in JS_BRANCH_KEYWORDS and func_stack:
+                if not (text == "if" and toks and toks[-1][1] == "else"):
+                    func_stack[-1]["complexity"] += 1
+            toks.append((kind, text, start, -1))
+            continue
+        if kind != "punct":
+            toks.append((kind, text, start, -1))
+            continue
+
+        if text in JS_BRANCH_OPERATORS:
+            if func_stack:
+                func_stack[-1]["complexity"] += 1
+        elif text == "?":
+            if func_stack and not JS_TERNARY_FOLLOW_RE.match(content, pos):
+                func_stack[-1]["complexity"] += 1
+        elif text == "(" or text == "[":
+            paren_stack.append(len(toks))
+        elif text == ")" or text == "]":
+            open_idx = paren_stack.pop() if paren_stack else 0
+            toks.append((kind, text, start, open_idx))
+            continue
+        elif text == ":":
+            if toks and toks[-1][1] == ")" and (_head_from_paren(toks, len(toks) - 1)
+                                                or _is_arrow_params(toks, len(toks) - 1)):
+                pending_sig = len(toks) - 1
+                pending_depth = (len(brace_stack), len(paren_stack))
+        elif text == ";" or text == "=":
+            pending_sig = -1
+        elif text == "{":
+            prev = toks[-1] if toks else None
+            head = None
+            at_sig_depth = pending_depth == (len(brace_stack), len(paren_stack))
+            if prev is None:
+                pass
+            elif prev[1] == ")":
+                head = _head_from_paren(toks, len(toks) - 1)
+            elif prev[1] == "=>":
+                sig = pending_sig if at_sig_depth else -1
+                head = _head_from_arrow(toks, len(toks) - 1, sig)
+            elif pending_sig >= 0 and at_sig_depth and prev[1] not in JS_TYPE_LITERAL_PREFIXES:
+                head = _head_from_paren(toks, pending_sig)
+            if at_sig_depth and (head is not None or prev is None
+                                 or prev[1] not in JS_TYPE_LITERAL_PREFIXES):
+                pending_sig = -1
+            if head is not None:
+                name, start_tok = head
+                line_no = line_of(start_tok[2])
+                finding = {
+                    "name": name,
+                    "line": line_no,
+                    "complexity": 1,
+                    "body_lines": 0,
+                    "snippet": snippet_of(line_no),
+                }
+                findings.append(finding)
+                func_stack.append(finding)
+                brace_stack.append(finding)
+            else:
+                brace_stack.append(None)
+            brace_lines.append(line_of(start))
+        elif text == "}":
+            if brace_stack:
+                opened = brace_stack.pop()
+                open_line = brace_lines.pop()
+                if opened == "template":
+                    in_template = True
+                    continue
+                if opened is not None:
+                    opened["body_lines"] = line_of(start) - open_line
+                    func_stack.pop()
+                if len(brace_stack) < pending_depth[0]:
+                    pending_sig = -1
+        toks.append((kind, text, start, -1))
+
+    # Unterminated bodies run to end of file.
+    for opened, open_line in zip(brace_stack, brace_lines):
+        if isinstance(opened, dict):
+            opened["body_lines"] = line_of(size) - open_line
+    return findings
 
-# ---------- JS/TS analysis (regex-based) ----------
 
 def analyze_js_file(file_path: Path, threshold: int) -> list[dict]:
     try:
         content = file_path.read_text(encoding="utf-8", errors="ignore")
     except OSError:
         return []
-
-    lines = content.splitlines()
-    findings = []
-    func_positions = []
-
-    for m in JS_METHOD_RE.finditer(content):
-        name = m.group(1) or m.group(2) or m.group(3) or "<anonymous>"
-        # Skip keywords that aren't real function names
-        if name in {"if", "else", "for", "while", "switch", "catch", "return"}:
-            continue
-        line_no = content[:m.start()].count("\n") + 1
-        func_positions.append((name, line_no, m.start()))
-
-    for name, line_no, start_pos in func_positions:
-        brace_pos = content.find("{", start_pos)
-        if brace_pos == -1:
-            continue
-        end_pos = brace_pos + 1
-        depth = 1
-        while end_pos < len(content) and depth > 0:
-            ch = content[end_pos]
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-            end_pos += 1
-
-        body = content[brace_pos:end_pos]
-        body_lines = body.count("\n")
-        cc = 1 + len(JS_BRANCH_RE.findall(body))
-        snippet = lines[line_no - 1].strip() if line_no <= len(lines) else ""
-        findings.append({
-            "name": name,
-            "line": line_no,
-            "complexity": cc,
-            "body_lines": body_lines,
-            "snippet": snippet,
-        })
-
-    return findings
+    return analyze_js_source(content)
 
 
 # ---------- Python ----------
@@ -122,32 +373,483 @@ def analyze_js_file(file_path: Path, threshold: int) -> list[dict]:
 def analyze_python_file(file_path: Path) -> list[dict]:
     try:
         source = file_path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return []
+    return analyze_python_source(source)
+
+
+def analyze_python_source(source: str) -> list[dict]:
+    try:
         tree = ast.parse(source)
-    except (SyntaxError, OSError):
+    except SyntaxError:
         return []
     visitor = ComplexityVisitor(source.splitlines())
     visitor.visit(tree)
     return visitor.findings
 
 
-def report_findings(file_path: Path, findings: list[dict], threshold: int, god_lines: int) -> int:
+def finding_issues(f: dict, threshold: int, god_lines: int) -> list[tuple[str, str]]:
+    """Return (rule_id, message) pairs for every threshold a finding breaks."""
+    issues = []
+    if f["complexity"] > threshold:
+        issues.append(("high-complexity", f"CC={f['complexity']} > threshold={threshold}"))
+    if f["body_lines"] >= god_lines:
+        issues.append(("god-method", f"God Method ({f['body_lines']} lines)"))
+    return issues
+
+
+def report_findings(file_path: Path, findings: list[dict], threshold: int, god_lines: int,
+                    out=sys.stdout) -> int:
     issues = 0
     for f in findings:
-        cc = f["complexity"]
-        body_lines = f["body_lines"]
-        tags = []
-        if cc > threshold:
-            tags.append(f"CC={cc} > threshold={threshold}")
-        if body_lines >= god_lines:
-            tags.append(f"God Method ({body_lines} lines)")
+        tags = [message for _, message in finding_issues(f, threshold, god_lines)]
         if tags:
             issues += 1
-            print(f"  ⚠️  {f['name']}  line {f['line']}  [{', '.join(tags)}]")
+            print(f"  ⚠️  {f['name']}  line {f['line']}  [{', '.join(tags)}]", file=out)
             if f["snippet"]:
-                print(f"      {f['snippet']}")
+                print(f"      {f['snippet']}", file=out)
     return issues
 
 
+# ---------- Reporters ----------
+
+SARIF_RULES = [
+    {
+        "id": "high-complexity",
+        "shortDescription": {"text": "Cyclomatic complexity above threshold"},
+    },
+    {
+        "id": "god-method",
+        "shortDescription": {"text": "Function body too long (God Method)"},
+    },
+]
+
+
+class TextReporter:
+    """Human-readable report; each file's issues are printed once it is analyzed."""
+
+    def __init__(self, threshold: int, god_lines: int, out=sys.stdout):
+        self.threshold = threshold
+        self.god_lines = god_lines
+        self.out = out
+
+    def start(self):
+        print("🧠 Cyclomatic Complexity Analyzer", file=self.out)
+        print(f"Threshold: CC > {self.threshold} | God Method > {self.god_lines} lines\n", file=self.out)
+
+    def file(self, file_path: Path, findings: list[dict]) -> int:
+        if not any(finding_issues(f, self.threshold, self.god_lines) for f in findings):
+            return 0
+        print(f"📄 {file_path}", file=self.out)
+        issues = report_findings(file_path, findings, self.threshold, self.god_lines, self.out)
+        print(file=self.out)
+        return issues
+
+    def finish(self, summary: dict):
+        print(f"Functions analyzed: {summary['functions_analyzed']}", file=self.out)
+        print(f"Issues found:       {summary['issues']}", file=self.out)
+        hotspots = summary.get("hotspots")
+        if hotspots is None:
+            return
+        print("\n🔥 Hotspots (complexity × profile share):", file=self.out)
+        if not hotspots:
+            print("  No analyzed function matched the profile data.", file=self.out)
+            return
+        print(f"  {'score':>8}  {'CC':>4}  {'share':>7}  {'cum(s)':>9}  {'calls':>8}  {'samples':>8}  function",
+              file=self.out)
+        for h in hotspots:
+            flag = "⚠️ " if h["complexity"] > self.threshold else "   "
+            print(f"  {h['score']:8.3f}  {h['complexity']:4d}  {h['share']:7.2%}  {h['cum_time_s']:9.3f}  "
+                  f"{h['calls']:8d}  {h['samples']:8d}  {flag}{h['name']}  {h['file']}:{h['line']}", file=self.out)
+
+
+class NdjsonReporter(TextReporter):
+    """One JSON object per issue, then a final summary record."""
+
+    def start(self):
+        pass
+
+    def _issues(self, file_path: Path, findings: list[dict]):
+        for f in findings:
+            issues = finding_issues(f, self.threshold, self.god_lines)
+            if issues:
+                yield {
+                    "file": file_path.as_posix(),
+                    "name": f["name"],
+                    "line": f["line"],
+                    "complexity": f["complexity"],
+                    "body_lines": f["body_lines"],
+                    "rules": [rule for rule, _ in issues],
+                    "message": ", ".join(message for _, message in issues),
+                    "snippet": f["snippet"],
+                }
+
+    def _write_record(self, record: dict):
+        self.out.write(json.dumps({"type": "finding", **record}, ensure_ascii=False) + "\n")
+
+    def file(self, file_path: Path, findings: list[dict]) -> int:
+        count = 0
+        for record in self._issues(file_path, findings):
+            self._write_record(record)
+            count += 1
+        if count:
+            self.out.flush()
+        return count
+
+    def finish(self, summary: dict):
+        self.out.write(json.dumps({"type": "summary", **summary}) + "\n")
+        self.out.flush()
+
+
+class JsonReporter(NdjsonReporter):
+    """A single JSON document whose findings array is written incrementally."""
+
+    def start(self):
+        self._first = True
+        self.out.write('{"findings": [')
+
+    def _write_record(self, record: dict):
+        self.out.write(("\n  " if self._first else ",\n  ") + json.dumps(record, ensure_ascii=False))
+        self._first = False
+
+    def finish(self, summary: dict):
+        self.out.write(f'\n], "summary": {json.dumps(summary)}}}\n')
+        self.out.flush()
+
+
+class SarifReporter(NdjsonReporter):
+    """SARIF 2.1.0 log with one result per broken rule, streamed as produced."""
+
+    def start(self):
+        self._first = True
+        driver = {"name": "complexity_analyzer", "version": ANALYZER_VERSION, "rules": SARIF_RULES}
+        self.out.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            f'"runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": ['
+        )
+
+    def _write_record(self, record: dict):
+        for rule in record["rules"]:
+            result = {
+                "ruleId": rule,
+                "level": "warning",
+                "message": {"text": f"{record['name']}: {record['message']}"},
+                "locations": [{
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": record["file"]},
+                        "region": {"startLine": record["line"]},
+                    },
+                }],
+                "properties": {
+                    "complexity": record["complexity"],
+                    "bodyLines": record["body_lines"],
+                },
+            }
+            self.out.write(("\n  " if self._first else ",\n  ") + json.dumps(result, ensure_ascii=False))
+            self._first = False
+
+    def finish(self, summary: dict):
+        self.out.write(f'\n], "properties": {json.dumps(summary)}}}]}}\n')
+        self.out.flush()
+
+
+REPORTERS = {
+    "text": TextReporter,
+    "ndjson": NdjsonReporter,
+    "json": JsonReporter,
+    "sarif": SarifReporter,
+}
+
+
+# ---------- Result cache ----------
+
+class ResultCache:
+    """On-disk cache of raw (threshold-independent) findings keyed by content hash.
+
+    Entries live in ``<root>/<k[:2]>/<k>.json``; reads bump the entry mtime so
+    ``prune`` can evict least-recently-used entries once the size cap is hit.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(data: bytes, language: str) -> str:
+        digest = hashlib.sha256(f"{ANALYZER_VERSION}:{language}:".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        entry = self._entry(key)
+        try:
+            findings = json.loads(entry.read_text(encoding="utf-8"))
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return findings
+
+    def put(self, key: str, findings: list[dict]):
+        entry = self._entry(key)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(findings, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, entry)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def prune(self):
+        """Evict least-recently-used entries until the cache is under 90% of its cap."""
+        entries = []
+        total = 0
+        for shard in (self.root.iterdir() if self.root.is_dir() else []):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= target:
+                break
+
+
+# ---------- Profile join ----------
+
+class ProfileIndex:
+    """Per-function cost from cProfile dumps and/or collapsed stack files.
+
+    Costs are indexed by source file basename so each analyzed file can be
+    joined as soon as its findings arrive; profile paths may be absolute or
+    relative to wherever the profiled process ran.
+    """
+
+    def __init__(self):
+        # basename -> {profile path: {(func name, line): [cum_s, self_s, calls, samples, self_samples]}}
+        self.by_basename: dict[str, dict[str, dict]] = defaultdict(dict)
+        self.total_time = 0.0
+        self.total_samples = 0
+
+    def _entry(self, filename: str, name: str, line: int) -> list:
+        funcs = self.by_basename[Path(filename).name].setdefault(Path(filename).as_posix(), {})
+        return funcs.setdefault((name, line), [0.0, 0.0, 0, 0, 0])
+
+    def load(self, path: Path):
+        try:
+            collapsed = self._is_collapsed(path)
+            if collapsed:
+                self._load_collapsed(path)
+                return
+        except OSError as exc:
+            raise SystemExit(f"Cannot read profile {path}: {exc}")
+        try:
+            stats = pstats.Stats(str(path))
+        except Exception as exc:  # marshal accepts some text files and pstats then fails arbitrarily
+            raise SystemExit(f"Cannot read profile {path}: not a cProfile dump or collapsed stacks ({exc})")
+        self.total_time += stats.total_tt
+        for (filename, line, name), (_, calls, self_s, cum_s, _) in stats.stats.items():
+            if filename.startswith(("~", "<")):
+                continue
+            entry = self._entry(filename, name, line)
+            entry[0] += cum_s
+            entry[1] += self_s
+            entry[2] += calls
+
+    @staticmethod
+    def _is_collapsed(path: Path) -> bool:
+        """Collapsed stacks are UTF-8 text lines ending in ` <count>`; anything else is left to pstats."""
+        with open(path, "rb") as handle:
+            head = handle.read(PROFILE_SNIFF_BYTES)
+        if len(head) == PROFILE_SNIFF_BYTES:
+            head = head[:head.rfind(b"\n") + 1]  # only whole lines
+        try:
+            lines = [line for line in head.decode("utf-8").splitlines() if line.strip()]
+        except UnicodeDecodeError:
+            return False
+        return bool(lines) and all(line.rstrip().rpartition(" ")[2].isdigit() for line in lines)
+
+    def _load_collapsed(self, path: Path):
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            for raw in handle:
+                stack, _, count = raw.rstrip().rpartition(" ")
+                if not stack or not count.isdigit():
+                    continue
+                samples = int(count)
+                self.total_samples += samples
+                seen = set()
+                leaf = None
+                for frame in stack.split(";"):
+                    m = COLLAPSED_FRAME_RE.match(frame)
+                    if not m:
+                        continue
+                    key = (m.group("file"), m.group("name"))
+                    leaf = (key, int(m.group("line") or 0))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    self._entry(key[0], key[1], leaf[1])[3] += samples
+                if leaf is not None:
+                    self._entry(leaf[0][0], leaf[0][1], leaf[1])[4] += samples
+
+    def _profiled_funcs(self, file_path: Path) -> dict:
+        merged: dict = {}
+        resolved = file_path.resolve().as_posix()
+        for profiled, funcs in self.by_basename.get(file_path.name, {}).items():
+            if resolved == profiled or resolved.endswith("/" + profiled.lstrip("./")):
+                merged.update(funcs)
+        return merged
+
+    def join(self, file_path: Path, findings: list[dict]) -> list[dict]:
+        """Attach profile cost to findings; each profiled function goes to the closest finding by name/line."""
+        funcs = self._profiled_funcs(file_path)
+        if not funcs:
+            return []
+        by_name = defaultdict(list)
+        for f in findings:
+            by_name[f["name"]].append(f)
+        joined: dict[int, list] = {}
+        for (name, line), cost in funcs.items():
+            candidates = by_name.get(name)
+            if not candidates:
+                continue
+
+            def distance(f):
+                end = f["line"] + f["body_lines"]
+                return 0 if f["line"] <= line <= end else abs(line - f["line"])
+
+            target = min(candidates, key=distance)
+            acc = joined.setdefault(id(target), [target, 0.0, 0.0, 0, 0, 0])
+            for i, value in enumerate(cost, 1):
+                acc[i] += value
+
+        rows = []
+        for f, cum_s, self_s, calls, samples, self_samples in joined.values():
+            shares = []
+            if self.total_time > 0 and cum_s:
+                shares.append(cum_s / self.total_time)
+            if self.total_samples > 0 and samples:
+                shares.append(samples / self.total_samples)
+            share = sum(shares) / len(shares) if shares else 0.0
+            if share <= 0:
+                continue
+            rows.append({
+                "file": file_path.as_posix(),
+                "name": f["name"],
+                "line": f["line"],
+                "complexity": f["complexity"],
+                "cum_time_s": round(cum_s, 6),
+                "self_time_s": round(self_s, 6),
+                "calls": calls,
+                "samples": samples,
+                "self_samples": self_samples,
+                "share": round(share, 6),
+                "score": round(f["complexity"] * share, 6),
+            })
+        return rows
+
+
+def analyze_file(file_path: Path, threshold: int, cache: "ResultCache | None" = None) -> list[dict]:
+    is_python = file_path.suffix.lower() == ".py"
+    if cache is None:
+        if is_python:
+            return analyze_python_file(file_path)
+        return analyze_js_file(file_path, threshold)
+
+    try:
+        data = file_path.read_bytes()
+    except OSError:
+        return []
+    key = ResultCache.key(data, "py" if is_python else "js")
+    findings = cache.get(key)
+    if findings is None:
+        # Match read_text(): lenient decoding plus universal newlines.
+        source = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+        findings = analyze_python_source(source) if is_python else analyze_js_source(source)
+        cache.put(key, findings)
+    return findings
+
+
+def collect_files(targets: list[str], log=sys.stdout) -> list[Path]:
+    files: list[Path] = []
+    for target_str in targets:
+        target = Path(target_str)
+        if target.is_dir():
+            files.extend(sorted(p for p in target.rglob("*")
+                                if p.suffix.lower() in SOURCE_SUFFIXES))
+        elif target.is_file():
+            files.append(target)
+        else:
+            print(f"  [skip] not found: {target}", file=log)
+    return files
+
+
+def git_changed_files(ref: str, cwd: Path) -> set[Path]:
+    """Absolute paths of files added or modified since the merge base of ref and HEAD.
+
+    Includes committed, staged and unstaged edits plus untracked files, so the
+    same scope works in CI and in a local working tree.
+    """
+    def git(*args: str) -> str:
+        result = subprocess.run(["git", "-C", str(cwd), *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    top = Path(git("rev-parse", "--show-toplevel").strip())
+    base = git("merge-base", ref, "HEAD").strip()
+    names = git("diff", "--name-only", "--diff-filter=d", base).splitlines()
+    names += git("ls-files", "--others", "--exclude-standard", "--full-name").splitlines()
+    return {(top / name).resolve() for name in names if name}
+
+
+def scope_to_changed(targets: list[str], changed: set[Path], log=sys.stdout) -> list[Path]:
+    """Changed source files under the given targets, without walking the tree."""
+    files: list[Path] = []
+    for target_str in targets:
+        target = Path(target_str)
+        if not target.exists():
+            print(f"  [skip] not found: {target}", file=log)
+            continue
+        resolved = target.resolve()
+        if target.is_file():
+            if resolved in changed:
+                files.append(target)
+            continue
+        files.extend(sorted(
+            target / path.relative_to(resolved) for path in changed
+            if path.suffix.lower() in SOURCE_SUFFIXES and path.is_relative_to(resolved) and path.is_file()
+        ))
+    return files
+
+
+def iter_findings(files: list[Path], threshold: int, jobs: int, cache: "ResultCache | None" = None):
+    """Yield (file_path, findings) in input order, fanning out to a process pool when jobs > 1."""
+    worker = partial(analyze_file, threshold=threshold, cache=cache)
+    if jobs <= 1 or len(files) < 2:
+        for file_path in files:
+            yield file_path, worker(file_path)
+        return
+    chunksize = max(1, min(64, len(files) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from zip(files, executor.map(worker, files, chunksize=chunksize))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Cyclomatic complexity analyzer for Python and JS/TS."
@@ -157,48 +859,69 @@ def main():
                         help="Cyclomatic complexity threshold (default: 10)")
     parser.add_argument("--god-method-lines", type=int, default=GOD_METHOD_LINES,
                         help="Lines threshold for God Method smell (default: 60)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for per-file analysis (0 = all cores, default: 1)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Persist raw findings here, keyed by file content hash")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB,
+                        help=f"Evict least-recently-used cache entries above this size (default: {CACHE_MAX_MB})")
+    parser.add_argument("--format", choices=sorted(REPORTERS), default="text",
+                        help="Output format; ndjson/json/sarif stream findings as they are produced")
+    parser.add_argument("--profile", action="append", default=[], metavar="FILE",
+                        help="cProfile .pstats dump or py-spy collapsed stacks; repeatable. "
+                             "Ranks functions by complexity × share of profiled time")
+    parser.add_argument("--since", default=None, metavar="GIT_REF",
+                        help="Only analyze files changed since the merge base with GIT_REF (e.g. origin/main)")
+    parser.add_argument("--top", type=int, default=HOTSPOT_TOP,
+                        help=f"Hotspots to report with --profile (default: {HOTSPOT_TOP})")
     args = parser.parse_args()
 
-    print("🧠 Cyclomatic Complexity Analyzer")
-    print(f"Threshold: CC > {args.threshold} | God Method > {args.god_method_lines} lines\n")
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = ResultCache(Path(args.cache_dir), args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+
+    profile = None
+    if args.profile:
+        profile = ProfileIndex()
+        for profile_path in args.profile:
+            profile.load(Path(profile_path))
+    hotspots: list[dict] = []
+
+    reporter = REPORTERS[args.format](args.threshold, args.god_method_lines)
+    reporter.start()
 
     total_issues = 0
     total_funcs = 0
 
-    for target_str in args.targets:
-        target = Path(target_str)
-        files: list[Path] = []
-        if target.is_dir():
-            files = [p for p in target.rglob("*")
-                     if p.suffix.lower() in {".py", ".js", ".ts", ".jsx", ".tsx"}]
-        elif target.is_file():
-            files = [target]
-        else:
-            print(f"  [skip] not found: {target}")
+    log = sys.stdout if args.format == "text" else sys.stderr
+    if args.since:
+        first = Path(args.targets[0])
+        changed = git_changed_files(args.since, first if first.is_dir() else first.parent)
+        files = scope_to_changed(args.targets, changed, log=log)
+        print(f"Scope: {len(files)} changed file(s) since {args.since}\n", file=log)
+    else:
+        files = collect_files(args.targets, log=log)
+    for file_path, findings in iter_findings(files, args.threshold, jobs, cache):
+        if not findings:
             continue
-
-        for file_path in sorted(files):
-            if file_path.suffix.lower() == ".py":
-                findings = analyze_python_file(file_path)
-            else:
-                findings = analyze_js_file(file_path, args.threshold)
-
-            if not findings:
-                continue
-
-            total_funcs += len(findings)
-            issues_in_file = sum(
-                1 for f in findings
-                if f["complexity"] > args.threshold or f["body_lines"] >= args.god_method_lines
-            )
-
-            if issues_in_file:
-                print(f"📄 {file_path}")
-                total_issues += report_findings(file_path, findings, args.threshold, args.god_method_lines)
-                print()
-
-    print(f"Functions analyzed: {total_funcs}")
-    print(f"Issues found:       {total_issues}")
+        total_funcs += len(findings)
+        total_issues += reporter.file(file_path, findings)
+        if profile is not None:
+            hotspots.extend(profile.join(file_path, findings))
+
+    if cache is not None:
+        cache.prune()
+
+    summary = {
+        "files_analyzed": len(files),
+        "functions_analyzed": total_funcs,
+        "issues": total_issues,
+        "threshold": args.threshold,
+        "god_method_lines": args.god_method_lines,
+    }
+    if profile is not None:
+        hotspots.sort(key=lambda h: h["score"], reverse=True)
+        summary["hotspots"] = hotspots[:args.top]
+    reporter.finish(summary)
     sys.exit(1 if total_issues > 0 else 0)
 
 
@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
 """Recommend database indexes based on SQL query analysis."""
 import argparse
+import csv
+import hashlib
+import json
+import math
+import random
 import re
+import sqlite3
 import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
 
 
 # --- SQL parsing patterns ---
@@ -15,14 +24,29 @@ COND_RE = re.compile(
     re.IGNORECASE,
 )
 JOIN_COL_RE = re.compile(
-    r"\bJOIN\b[^ON]*\bON\b\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)",
-    re.IGNORECASE,
+    r"\bJOIN\b(?:(?!\bON\b).)*?\bON\b\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)",
+    re.IGNORECASE | re.DOTALL,
 )
 ORDER_RE = re.compile(
     r"\bORDER\s+BY\b\s+([\w\s,]+?)(?:\bLIMIT\b|$)",
     re.IGNORECASE | re.DOTALL,
 )
 ORDER_COL_RE = re.compile(r"\b(\w+)\s*(ASC|DESC)?", re.IGNORECASE)
+TABLE_REF_RE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE)\s+([\w.]+)(?:\s+(?:AS\s+)?(\w+))?",
+    re.IGNORECASE,
+)
+QUALIFIED_ORDER_RE = re.compile(
+    r"\bORDER\s+BY\b\s+([\w\s,.]+?)(?:\bLIMIT\b|\bOFFSET\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+QUALIFIED_ORDER_COL_RE = re.compile(r"\b(?:(\w+)\.)?(\w+)\s*(ASC|DESC)?", re.IGNORECASE)
+QUALIFIER_RE = re.compile(r"(\w+)\.$")
+STATEMENT_SPLIT_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|;", re.DOTALL)
+ALIAS_STOPWORDS = {
+    "where", "join", "inner", "left", "right", "full", "cross", "outer", "on", "using", "group",
+    "order", "limit", "offset", "having", "set", "natural", "lateral", "union", "window",
+}
 
 
 def _clean_col(name: str) -> str:
@@ -88,10 +112,11 @@ def build_index_columns(
     where_cols: list[tuple[str, str]],
     join_cols: list[str],
     order_cols: list[tuple[str, str]],
+    rank=cardinality_rank,
 ) -> list[tuple[str, str]]:
     """
     Composite index column order rules:
-    1. Equality WHERE columns first (sorted by cardinality desc)
+    1. Equality WHERE columns first (sorted by cardinality desc, via ``rank``)
     2. JOIN columns next
     3. Range WHERE columns
     4. ORDER BY columns last (preserving their direction)
@@ -106,7 +131,7 @@ def build_index_columns(
 
     # 1. Equality columns by cardinality
     eq_cols = [(col, op) for col, op in where_cols if op == "eq"]
-    eq_cols.sort(key=lambda x: cardinality_rank(x[0]), reverse=True)
+    eq_cols.sort(key=lambda x: rank(x[0]), reverse=True)
     for col, _ in eq_cols:
         add(col)
 
@@ -126,6 +151,975 @@ def build_index_columns(
     return result
 
 
+# --- Column statistics ---
+DEFAULT_ROWS = 1_000_000
+RANGE_SELECTIVITY = 1 / 3  # PostgreSQL's DEFAULT_INEQ_SEL for an open-ended range
+# Stand-in equality selectivities for columns without statistics, by cardinality_rank.
+HEURISTIC_SELECTIVITY = {3: 1e-4, 2: 1e-2, 1: 0.2}
+HLL_PRECISION = 12
+SAMPLE_TOP_K = 20
+# Sample distinct counts within HLL error of the non-null count mean "unique".
+UNIQUE_SAMPLE_RATIO = 0.95
+
+
+class HyperLogLog:
+    """Distinct-count sketch: 2**precision 6-bit registers, ~1.6% standard error at p=12."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & ((1 << 64) - 1)
+        rank = 64 - self.precision + 1 if rest == 0 else (64 - rest.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return estimate
+
+
+class TopK:
+    """Misra-Gries heavy hitters: any value above 1/(k+1) of rows is kept; counts are lower bounds."""
+
+    def __init__(self, k: int = SAMPLE_TOP_K):
+        self.k = k
+        self.counters: dict[str, int] = {}
+
+    def add(self, value: str):
+        if value in self.counters:
+            self.counters[value] += 1
+        elif len(self.counters) < self.k:
+            self.counters[value] = 1
+        else:
+            for key in list(self.counters):
+                self.counters[key] -= 1
+                if not self.counters[key]:
+                    del self.counters[key]
+
+
+def load_pg_stats(path: str) -> dict[str, dict[str, dict]]:
+    """``{table: {column: {"n_distinct", "null_frac", "mcv_freqs"}}}`` from a pg_stats CSV export.
+
+    ``n_distinct`` keeps pg_stats' convention: negative means a fraction of the rows.
+    """
+    stats: dict[str, dict[str, dict]] = {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            freqs = (row.get("most_common_freqs") or "").strip("{}")
+            stats.setdefault(row["tablename"].lower(), {})[row["attname"].lower()] = {
+                "n_distinct": float(row.get("n_distinct") or 0),
+                "null_frac": float(row.get("null_frac") or 0),
+                "mcv_freqs": [float(f) for f in freqs.split(",") if f],
+            }
+    return stats
+
+
+def profile_sample_csv(path: str) -> tuple[dict[str, dict], int]:
+    """Profile a sample CSV (header row = column names) in one pass with bounded memory.
+
+    Each column gets a HyperLogLog distinct count, a null fraction (empty
+    cells) and Misra-Gries top-k frequencies, in the same shape as
+    ``load_pg_stats``. Returns the column stats and the sample's row count.
+
+    A column that is unique within the sample is stored as a negative
+    fraction of the rows (pg_stats' convention), so it scales to ``--rows``;
+    other distinct counts stay absolute, since a sample cannot tell how
+    they grow with the table.
+    """
+    with open(path, newline="", encoding="utf-8", errors="ignore") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip().lower() for name in next(reader, [])]
+        sketches = [(HyperLogLog(), TopK()) for _ in header]
+        nulls = [0] * len(header)
+        rows = 0
+        for record in reader:
+            rows += 1
+            for i, value in enumerate(record[:len(header)]):
+                if value == "" or value.upper() == "NULL":
+                    nulls[i] += 1
+                    continue
+                sketches[i][0].add(value)
+                sketches[i][1].add(value)
+    columns = {}
+    for i, name in enumerate(header):
+        hll, top = sketches[i]
+        present = rows - nulls[i]
+        distinct = min(hll.count(), present) if present else 0
+        if distinct >= UNIQUE_SAMPLE_RATIO * present:
+            n_distinct = -present / rows if present else 0.0
+        else:
+            n_distinct = float(round(distinct))
+        # Only values seen often enough to matter are treated as "most common".
+        freqs = sorted((count / rows for count in top.counters.values() if count / rows > 1 / (top.k + 1)),
+                       reverse=True)
+        columns[name] = {
+            "n_distinct": n_distinct,
+            "null_frac": nulls[i] / rows if rows else 0.0,
+            "mcv_freqs": freqs,
+        }
+    return columns, rows
+
+
+def equality_selectivity(column: "dict | None", rows: int, col: str = "") -> float:
+    """Expected fraction of rows matching ``col = <value drawn from the data>``.
+
+    Most-common values contribute their squared frequency; the remaining
+    non-null rows are spread evenly over the other distinct values. Without
+    statistics, falls back to ``cardinality_rank``'s name heuristic.
+    """
+    if not column:
+        return HEURISTIC_SELECTIVITY[cardinality_rank(col)]
+    n_distinct = column["n_distinct"]
+    if n_distinct < 0:
+        n_distinct = -n_distinct * rows
+    mcv = column["mcv_freqs"]
+    rest = max(0.0, 1.0 - column["null_frac"] - sum(mcv))
+    others = max(1.0, n_distinct - len(mcv))
+    return min(1.0, sum(f * f for f in mcv) + rest * rest / others)
+
+
+def selectivity_rank(table_stats: dict[str, dict], rows: int):
+    """A ``build_index_columns`` rank key: more selective columns rank higher."""
+    def rank(col: str) -> float:
+        return -equality_selectivity(table_stats.get(col.lower()), rows, col)
+    return rank
+
+
+def estimate_rows_scanned(columns: list[tuple[str, str]], eq_len: int, table_stats: dict[str, dict],
+                          rows: int) -> int:
+    """Index entries read: rows × the leading equality columns' selectivity × one range bound, if any."""
+    fraction = 1.0
+    for col, _ in columns[:eq_len]:
+        fraction *= equality_selectivity(table_stats.get(col.lower()), rows, col)
+    if eq_len < len(columns):
+        fraction *= RANGE_SELECTIVITY
+    return max(1, round(rows * fraction))
+
+
+# --- Workload batch mode ---
+WORKLOAD_QUERY_KEYS = ("query", "statement", "sql")
+MAX_INDEXES_PER_TABLE = 5
+
+
+def split_sql_statements(text: str) -> list[str]:
+    """Split a SQL script on top-level semicolons (quotes and comments respected)."""
+    statements = []
+    start = 0
+    for m in STATEMENT_SPLIT_RE.finditer(text):
+        if m.group(0) == ";":
+            statements.append(text[start:m.start()].strip())
+            start = m.end()
+    statements.append(text[start:].strip())
+    return [stmt for stmt in statements if stmt]
+
+
+def _workload_entry(item: dict) -> "dict | None":
+    query = next((item[key] for key in WORKLOAD_QUERY_KEYS if item.get(key)), None)
+    if not query:
+        return None
+    count = int(item.get("calls", item.get("count", 1)) or 1)
+    total_ms = item.get("total_ms")
+    if total_ms is None and "mean_ms" in item:
+        total_ms = item["mean_ms"] * count
+    if total_ms is None:
+        total_ms = item.get("duration_ms", 0.0)
+    return {"query": query, "count": count, "total_ms": float(total_ms or 0.0)}
+
+
+def load_workload(path: str) -> list[dict]:
+    """Read a workload as ``{"query", "count", "total_ms"}`` entries.
+
+    Accepts a ``.sql`` script, NDJSON with one ``{"query": ..., "count": ...,
+    "total_ms": ...}`` object per line, or JSON - either a list of such
+    objects or a ``slow_query_analyzer.py --json`` report, whose
+    ``top_by_total_time`` rows carry call counts and total time.
+    """
+    text = Path(path).read_text(encoding="utf-8", errors="ignore")
+    if path.endswith(".sql"):
+        return [{"query": stmt, "count": 1, "total_ms": 0.0} for stmt in split_sql_statements(text)]
+    if path.endswith((".ndjson", ".jsonl")):
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            items = data.get("top_by_total_time") or data.get("slowest_queries") or []
+        else:
+            items = data
+    return [entry for entry in map(_workload_entry, items) if entry]
+
+
+def dedupe_workload(entries: list[dict]) -> list[dict]:
+    """Merge entries that share a fingerprint, summing their counts and time."""
+    from slow_query_analyzer import normalize_sql  # sibling script; imports this module at load time
+
+    merged: dict[str, dict] = {}
+    for entry in entries:
+        fingerprint = normalize_sql(entry["query"])
+        agg = merged.get(fingerprint)
+        if agg is None:
+            merged[fingerprint] = {**entry, "fingerprint": fingerprint}
+            continue
+        agg["count"] += entry["count"]
+        agg["total_ms"] += entry["total_ms"]
+    return list(merged.values())
+
+
+def table_aliases(query: str) -> dict[str, str]:
+    """Map each alias (and bare table name) to its table, in FROM/JOIN order."""
+    aliases: dict[str, str] = {}
+    for m in TABLE_REF_RE.finditer(query):
+        table = m.group(1).split(".")[-1]
+        if table.lower() in ALIAS_STOPWORDS or table.startswith("("):
+            continue
+        aliases.setdefault(table.lower(), table)
+        alias = m.group(2)
+        if alias and alias.lower() not in ALIAS_STOPWORDS:
+            aliases.setdefault(alias.lower(), table)
+    return aliases
+
+
+def table_columns(query: str) -> dict[str, tuple[list, list, list]]:
+    """Per-table (where_cols, join_cols, order_cols) for a possibly multi-table query.
+
+    Qualified columns go to their alias's table; unqualified ones to the
+    first table in FROM.
+    """
+    aliases = table_aliases(query)
+    if not aliases:
+        return {}
+    first = next(iter(aliases.values()))
+    per_table: dict[str, tuple[list, list, list]] = {}
+
+    def slot(qualifier: "str | None") -> tuple[list, list, list]:
+        table = aliases.get(qualifier.lower(), first) if qualifier else first
+        return per_table.setdefault(table, ([], [], []))
+
+    m = WHERE_COL_RE.search(query)
+    if m:
+        clause = m.group(1)
+        range_ops = re.compile(r"[<>]|BETWEEN|LIKE", re.IGNORECASE)
+        for cond_m in COND_RE.finditer(clause):
+            qualifier = QUALIFIER_RE.search(clause, 0, cond_m.start())
+            op_type = "range" if range_ops.search(cond_m.group(0)) else "eq"
+            slot(qualifier.group(1) if qualifier else None)[0].append((cond_m.group(1), op_type))
+    for m in JOIN_COL_RE.finditer(query):
+        slot(m.group(1))[1].append(m.group(2))
+        slot(m.group(3))[1].append(m.group(4))
+    m = QUALIFIED_ORDER_RE.search(query)
+    if m:
+        for col_m in QUALIFIED_ORDER_COL_RE.finditer(m.group(1)):
+            if col_m.group(2).upper() not in {"ASC", "DESC", "BY"}:
+                slot(col_m.group(1))[2].append((col_m.group(2), (col_m.group(3) or "ASC").upper()))
+    return per_table
+
+
+def _eq_prefix_len(columns: list[tuple[str, str]], where_cols: list[tuple[str, str]]) -> int:
+    eq_names = {col.lower() for col, op in where_cols if op == "eq"}
+    length = 0
+    while length < len(columns) and columns[length][0].lower() in eq_names:
+        length += 1
+    return length
+
+
+def _serves(index_cols: list, candidate: dict) -> bool:
+    """An index serves a candidate if the candidate's leading equality set and then
+    its remaining columns, in order, form a prefix of the index."""
+    cols = candidate["columns"]
+    eq_len = candidate["eq_len"]
+    if len(index_cols) < len(cols):
+        return False
+    if {c.lower() for c, _ in index_cols[:eq_len]} != {c.lower() for c, _ in cols[:eq_len]}:
+        return False
+    return [(c.lower(), d) for c, d in index_cols[eq_len:len(cols)]] == [(c.lower(), d) for c, d in cols[eq_len:]]
+
+
+def _reorder_for(index: dict, candidate: dict) -> "list | None":
+    """Try putting the candidate's equality columns first within the index's
+    leading equality block, keeping every query the index already serves."""
+    eq_names = {c.lower() for c, _ in candidate["columns"][:candidate["eq_len"]]}
+    block = index["columns"][:index["eq_len"]]
+    if not eq_names <= {c.lower() for c, _ in block}:
+        return None
+    front = [col for col in block if col[0].lower() in eq_names]
+    back = [col for col in block if col[0].lower() not in eq_names]
+    reordered = front + back + index["columns"][index["eq_len"]:]
+    if _serves(reordered, candidate) and all(_serves(reordered, member) for member in index["members"]):
+        return reordered
+    return None
+
+
+def consolidate_indexes(candidates: list[dict]) -> list[dict]:
+    """Greedily prefix-merge one table's candidates so one composite index serves many queries.
+
+    Longest candidates are placed first; each shorter one joins an index that
+    already serves it, or one whose leading equality block can be reordered
+    to serve it. The leading equality columns of a query are treated as a
+    set, since their order doesn't matter for an equality lookup.
+    """
+    indexes: list[dict] = []
+    ordered = sorted(candidates, key=lambda c: (len(c["columns"]), c["weight"]), reverse=True)
+    for candidate in ordered:
+        home = next((index for index in indexes if _serves(index["columns"], candidate)), None)
+        if home is None:
+            for index in indexes:
+                reordered = _reorder_for(index, candidate)
+                if reordered is not None:
+                    index["columns"] = reordered
+                    home = index
+                    break
+        if home is None:
+            home = {"columns": list(candidate["columns"]), "eq_len": candidate["eq_len"], "members": []}
+            indexes.append(home)
+        home["members"].append(candidate)
+    for index in indexes:
+        index["weight"] = sum(member["weight"] for member in index["members"])
+    indexes.sort(key=lambda index: index["weight"], reverse=True)
+    return indexes
+
+
+def recommend_workload(entries: list[dict], max_per_table: int = MAX_INDEXES_PER_TABLE,
+                       catalog: "dict | None" = None, row_counts: "dict | None" = None,
+                       stats: "dict | None" = None, verify: "dict | None" = None) -> dict[str, dict]:
+    """Consolidated index recommendations per table for a deduplicated workload.
+
+    Each query shape is weighted by its total time when the workload has
+    timings, else by its call count. With a schema ``catalog``, query shapes
+    an existing index already serves are reported as covered instead of
+    suggested, new indexes list the existing ones they supersede, and
+    non-unique indexes that no query in the workload can use are flagged.
+    ``row_counts`` enables size estimates. Column ``stats`` (pg_stats or a
+    profiled sample) order equality columns by measured selectivity and give
+    each suggestion an estimate of the rows it scans. ``verify`` (keyword
+    arguments for ``verify_index``) checks each suggestion in SQLite against
+    the heaviest query it serves.
+    """
+    catalog = catalog or {}
+    row_counts = row_counts or {}
+    stats = stats or {}
+    timed = any(entry["total_ms"] for entry in entries)
+    per_table: dict[str, list[dict]] = {}
+    for entry in entries:
+        weight = entry["total_ms"] if timed else entry["count"]
+        for table, (where_cols, join_cols, order_cols) in table_columns(entry["query"]).items():
+            rank = cardinality_rank
+            if table.lower() in stats:
+                rank = selectivity_rank(stats[table.lower()], row_counts.get(table.lower(), DEFAULT_ROWS))
+            columns = build_index_columns(where_cols, join_cols, order_cols, rank)
+            if not columns:
+                continue
+            per_table.setdefault(table, []).append({
+                "columns": columns,
+                "eq_len": _eq_prefix_len(columns, where_cols),
+                "weight": weight,
+                "entry": entry,
+            })
+
+    report: dict[str, dict] = {}
+    for table, candidates in sorted(per_table.items()):
+        table_entry = catalog.get(table.lower())
+        covered: dict[str, int] = {}
+        open_candidates = []
+        for candidate in candidates:
+            existing = covering_index(table_entry, candidate)
+            if existing is None:
+                open_candidates.append(candidate)
+            else:
+                covered[existing["name"]] = covered.get(existing["name"], 0) + 1
+
+        suggested = []
+        superseded_names: set[str] = set()
+        for index in consolidate_indexes(open_candidates)[:max_per_table]:
+            col_names = [col for col, _ in index["columns"]]
+            superseded = [existing["name"] for existing in superseded_indexes(table_entry, index["columns"])]
+            superseded_names.update(superseded)
+            rows = row_counts.get(table.lower())
+            size = None
+            if rows is not None:
+                size = estimate_index_bytes(col_names, (table_entry or {}).get("columns", {}), rows)
+            scanned = None
+            if table.lower() in stats:
+                defining = index["members"][0]
+                scanned = estimate_rows_scanned(index["columns"], defining["eq_len"], stats[table.lower()],
+                                                rows or DEFAULT_ROWS)
+            suggested.append({
+                "create_index": generate_create_index(table, index["columns"]),
+                "columns": col_names,
+                "queries": len(index["members"]),
+                "calls": sum(member["entry"]["count"] for member in index["members"]),
+                "total_ms": round(sum(member["entry"]["total_ms"] for member in index["members"]), 3),
+                "weight": round(index["weight"], 3),
+                "estimated_bytes": size,
+                "estimated_rows_scanned": scanned,
+                "supersedes": superseded,
+                "examples": [member["entry"]["fingerprint"] for member in index["members"][:3]],
+            })
+            if verify is not None:
+                heaviest = max(index["members"], key=lambda member: member["weight"])
+                suggested[-1]["verification"] = verify_index(heaviest["entry"]["query"], suggested[-1]["create_index"],
+                                                             catalog, stats, **verify)
+
+        unused = []
+        for existing in (table_entry or {}).get("indexes", []):
+            if existing["unique"]:
+                continue
+            if existing["name"] in superseded_names:
+                unused.append({"name": existing["name"], "reason": "left-prefix of a suggested index"})
+            elif not any(_index_usable(existing, candidate) for candidate in candidates):
+                unused.append({"name": existing["name"], "reason": "no query in the workload can use it"})
+
+        report[table] = {
+            "suggested": suggested,
+            "covered": [{"index": name, "queries": count} for name, count in covered.items()],
+            "unused": unused,
+        }
+    return report
+
+
+def print_workload_report(report: dict[str, dict], shapes: int, statements: int):
+    print("🗂️  Index Recommender — workload")
+    print(f"Statements: {statements}  |  Distinct query shapes: {shapes}\n")
+    if not report:
+        print("⚠️  No indexable columns detected in the workload.")
+        return
+    for table, result in report.items():
+        print(f"📋 {table}")
+        for index in result["suggested"]:
+            print(f"  💡 {index['create_index']}")
+            print(f"     serves {index['queries']} query shape(s), {index['calls']} call(s)"
+                  + (f", {index['total_ms']:.2f}ms" if index["total_ms"] else "")
+                  + (f", ≈{human_bytes(index['estimated_bytes'])} on disk" if index["estimated_bytes"] else "")
+                  + (f", ≈{index['estimated_rows_scanned']:,} rows scanned" if index["estimated_rows_scanned"]
+                     else ""))
+            if index["supersedes"]:
+                print(f"     supersedes {', '.join(index['supersedes'])}")
+            for example in index["examples"]:
+                print(f"       · {example[:160]}")
+            if "verification" in index:
+                print_verification(index["verification"], indent="     ")
+        for item in result["covered"]:
+            print(f"  ✅ {item['index']} already serves {item['queries']} query shape(s)")
+        for item in result["unused"]:
+            print(f"  🗑️  {item['name']}: {item['reason']}")
+        print()
+    print("✅ Apply with care on large tables — prefer CONCURRENTLY for PostgreSQL.")
+
+
+# --- Schema catalog ---
+CREATE_TABLE_RE = re.compile(
+    r"\bCREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:(?:TEMP|TEMPORARY|UNLOGGED)\s+)?TABLE\s+"
+    r"(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)\s*\(",
+    re.IGNORECASE,
+)
+CREATE_INDEX_RE = re.compile(
+    r"\bCREATE\s+(UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+\s+)?"
+    r"ON\s+(?:ONLY\s+)?([\w.\"]+)\s*(?:USING\s+(\w+)\s*)?\(",
+    re.IGNORECASE,
+)
+TABLE_CONSTRAINT_RE = re.compile(r"^(?:CONSTRAINT\s+[\w\"]+\s+)?(PRIMARY\s+KEY|UNIQUE)\s*\(", re.IGNORECASE)
+COLUMN_CONSTRAINT_WORDS = {
+    "not", "null", "default", "primary", "unique", "references", "check", "constraint",
+    "generated", "collate", "identity",
+}
+INDEX_COLUMN_RE = re.compile(r'^"?(\w+)"?(?:\s+(?!ASC\b|DESC\b|NULLS\b)\w+)*?(?:\s+(ASC|DESC))?(?:\s+NULLS\s+\w+)?$',
+                             re.IGNORECASE)
+
+# Per-value width in bytes of common PostgreSQL types; variable-length ones use VARLENA_WIDTH.
+TYPE_WIDTHS = {
+    "smallint": 2, "int2": 2, "integer": 4, "int": 4, "int4": 4, "serial": 4, "bigint": 8, "int8": 8,
+    "bigserial": 8, "real": 4, "float4": 4, "double precision": 8, "float8": 8, "numeric": 12, "decimal": 12,
+    "money": 8, "boolean": 1, "bool": 1, "date": 4, "time": 8, "timetz": 12, "timestamp": 8,
+    "timestamptz": 8, "interval": 16, "uuid": 16, "inet": 10, "cidr": 10, "macaddr": 6, "oid": 4,
+}
+VARLENA_WIDTH = 32
+PAGE_BYTES = 8192
+PAGE_OVERHEAD = 24 + 16  # page header + btree special space
+INDEX_TUPLE_OVERHEAD = 8 + 4  # IndexTupleData + line pointer
+BTREE_FILLFACTOR = 0.9
+
+
+def _unquote(name: str) -> str:
+    return name.strip().split(".")[-1].strip('"')
+
+
+def _closing_paren(text: str, open_index: int) -> int:
+    """Index of the parenthesis closing the one at ``open_index`` (or len(text))."""
+    depth = 0
+    for i in range(open_index, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
+
+
+def _split_top_level(text: str) -> list[str]:
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def _index_columns(column_list: str) -> list[tuple[str, str]]:
+    """(column, direction) per index key; expressions are kept verbatim and never match a column."""
+    columns = []
+    for item in _split_top_level(column_list):
+        m = INDEX_COLUMN_RE.match(item)
+        columns.append((m.group(1), (m.group(2) or "ASC").upper()) if m else (item, "EXPR"))
+    return columns
+
+
+def _table_entry(catalog: dict, table: str) -> dict:
+    return catalog.setdefault(table.lower(), {"name": table, "columns": {}, "indexes": []})
+
+
+def parse_ddl(text: str, catalog: dict):
+    """Add CREATE TABLE columns/constraints and CREATE INDEX definitions to ``catalog``."""
+    for m in CREATE_TABLE_RE.finditer(text):
+        table = _unquote(m.group(1))
+        entry = _table_entry(catalog, table)
+        body = text[m.end():_closing_paren(text, m.end() - 1)]
+        for item in _split_top_level(body):
+            constraint = TABLE_CONSTRAINT_RE.match(item)
+            if constraint:
+                cols = _index_columns(item[constraint.end():_closing_paren(item, constraint.end() - 1)])
+                if constraint.group(1).upper().startswith("PRIMARY"):
+                    name = f"{table}_pkey"
+                else:
+                    name = f"{table}_{'_'.join(c for c, _ in cols)}_key"
+                entry["indexes"].append({"name": name, "columns": cols, "unique": True, "partial": False,
+                                         "method": "btree"})
+                continue
+            if item.split(None, 1)[0].upper() in {"CONSTRAINT", "FOREIGN", "CHECK", "EXCLUDE", "LIKE"}:
+                continue
+            words = item.split()
+            column = words[0].strip('"')
+            type_words = []
+            for word in words[1:]:
+                if word.lower() in COLUMN_CONSTRAINT_WORDS:
+                    break
+                type_words.append(word)
+            entry["columns"][column.lower()] = " ".join(type_words).lower()
+            upper = item.upper()
+            if "PRIMARY KEY" in upper or re.search(r"\bUNIQUE\b", upper):
+                kind = "pkey" if "PRIMARY KEY" in upper else f"{column}_key"
+                entry["indexes"].append({"name": f"{table}_{kind}", "columns": [(column, "ASC")], "unique": True,
+                                         "partial": False, "method": "btree"})
+    for m in CREATE_INDEX_RE.finditer(text):
+        table = _unquote(m.group(3))
+        close = _closing_paren(text, m.end() - 1)
+        end = text.find(";", close)
+        tail = text[close + 1:end if end >= 0 else len(text)]
+        _table_entry(catalog, table)["indexes"].append({
+            "name": _unquote(m.group(2) or f"{table}_idx"),
+            "columns": _index_columns(text[m.end():close]),
+            "unique": bool(m.group(1)),
+            "partial": bool(re.search(r"\bWHERE\b", tail, re.IGNORECASE)),
+            "method": (m.group(4) or "btree").lower(),
+        })
+
+
+def load_schema(paths: list[str]) -> dict:
+    """Per-table catalog ``{table: {"name", "columns": {col: type}, "indexes": [...]}}``.
+
+    Reads DDL scripts (CREATE TABLE / CREATE INDEX) and ``pg_indexes`` CSV
+    exports, whose ``indexdef`` column holds each index's CREATE INDEX.
+    """
+    catalog: dict = {}
+    for path in paths:
+        if path.endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as handle:
+                for row in csv.DictReader(handle):
+                    if row.get("indexdef"):
+                        parse_ddl(row["indexdef"], catalog)
+        else:
+            parse_ddl(Path(path).read_text(encoding="utf-8", errors="ignore"), catalog)
+    return catalog
+
+
+def parse_row_counts(values: list[str]) -> dict[str, int]:
+    counts = {}
+    for value in values:
+        table, _, rows = value.partition("=")
+        counts[table.strip().lower()] = int(float(rows))
+    return counts
+
+
+def column_width(type_name: str) -> int:
+    """Approximate stored width of one value of ``type_name``."""
+    base = re.sub(r"\s*\(.*?\)", "", type_name).replace(" without time zone", "")
+    if base.endswith(" with time zone"):
+        base = base.replace(" with time zone", "") + "tz"
+    if base in TYPE_WIDTHS:
+        return TYPE_WIDTHS[base]
+    length = re.search(r"\((\d+)\)", type_name)
+    if length and base in {"varchar", "character varying", "char", "character", "bpchar"}:
+        return min(int(length.group(1)), VARLENA_WIDTH) + 1
+    return VARLENA_WIDTH
+
+
+def estimate_index_bytes(columns: list[str], column_types: dict[str, str], rows: int) -> int:
+    """Rough B-tree size: MAXALIGN'd leaf tuples at 90% fill, plus internal pages and the metapage."""
+    data = sum(column_width(column_types.get(col.lower(), "")) for col in columns)
+    tuple_bytes = INDEX_TUPLE_OVERHEAD + (data + 7) // 8 * 8
+    per_page = max(1, int((PAGE_BYTES - PAGE_OVERHEAD) * BTREE_FILLFACTOR // tuple_bytes))
+    leaf_pages = math.ceil(rows / per_page) if rows else 1
+    internal_pages = math.ceil(leaf_pages / per_page) if leaf_pages > 1 else 0
+    return (leaf_pages + internal_pages + 1) * PAGE_BYTES
+
+
+def human_bytes(size: float) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _plain_btree(index: dict) -> bool:
+    return index["method"] == "btree" and not index["partial"]
+
+
+def covering_index(table_entry: "dict | None", candidate: dict) -> "dict | None":
+    """An existing full B-tree index that already serves ``candidate``, if any."""
+    for index in (table_entry or {}).get("indexes", []):
+        if _plain_btree(index) and _serves(index["columns"], candidate):
+            return index
+    return None
+
+
+def superseded_indexes(table_entry: "dict | None", columns: list[tuple[str, str]]) -> list[dict]:
+    """Existing non-unique indexes that are left-prefixes of ``columns`` and become redundant once it exists."""
+    return [
+        index for index in (table_entry or {}).get("indexes", [])
+        if _plain_btree(index) and not index["unique"] and len(index["columns"]) < len(columns)
+        and _serves(columns, {"columns": index["columns"], "eq_len": 0})
+    ]
+
+
+def _index_usable(index: dict, candidate: dict) -> bool:
+    """Whether a query could use at least the leading column of an existing index."""
+    leading = index["columns"][0][0].lower()
+    usable = candidate["columns"][:candidate["eq_len"] + 1]
+    return any(col.lower() == leading for col, _ in usable)
+
+
+# --- SQLite verification ---
+VERIFY_ROWS = 100_000
+VERIFY_REPEAT = 5
+ZIPF_S = 1.1
+LITERAL_RE = re.compile(
+    r"\b(?:\w+\.)?(\w+)\s*(?:=|<>|!=|>=|<=|>|<)\s*('(?:[^']|'')*'|-?\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+UPDATE_SET_RE = re.compile(r"\bSET\s+(.*?)(?:\bWHERE\b|$)", re.IGNORECASE | re.DOTALL)
+SELECT_LIST_RE = re.compile(r"^\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\bFROM\b", re.IGNORECASE | re.DOTALL)
+QUALIFIED_COL_RE = re.compile(r"\b(\w+)\.(\w+)\b")
+PLACEHOLDER_RE = re.compile(r"\$\d+|(?<![\w'])\?|%s|%\(\w+\)s")
+PARAM = r"(\$\d+|(?<![\w'])\?|%s|%\(\w+\)s)"
+BOUND_PARAM_RE = re.compile(
+    r"\b(?:(\w+)\.)?(\w+)\s*(=|<>|!=|>=|<=|>|<|\bLIKE\b|\bIN\s*\()\s*" + PARAM, re.IGNORECASE
+)
+BETWEEN_PARAM_RE = re.compile(
+    r"\b(?:(\w+)\.)?(\w+)\s+BETWEEN\s+" + PARAM + r"\s+AND\s+" + PARAM, re.IGNORECASE
+)
+PAGING_PARAM_RE = re.compile(r"\b(LIMIT|OFFSET)\s+" + PARAM, re.IGNORECASE)
+DATE_LITERAL_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+TIME_SUFFIXES = ("_at", "_on", "_date", "_time", "_ts")
+VERIFY_EPOCH = datetime(2024, 1, 1)
+
+
+def _column_kind(col: str, type_name: str, literals: list) -> str:
+    """int | real | time | text, from the declared type, else the query's literals, else the name."""
+    type_name = type_name.lower()
+    if type_name:
+        if any(word in type_name for word in ("int", "serial", "bool")):
+            return "int"
+        if any(word in type_name for word in ("numeric", "decimal", "real", "double", "float", "money")):
+            return "real"
+        if any(word in type_name for word in ("date", "time")):
+            return "time"
+        return "text"
+    for literal in literals:
+        if isinstance(literal, (int, float)):
+            return "real" if isinstance(literal, float) else "int"
+        if DATE_LITERAL_RE.match(literal):
+            return "time"
+    lower = col.lower()
+    if lower == "id" or lower.endswith(("_id", "_count")):
+        return "int"
+    if lower.endswith(TIME_SUFFIXES):
+        return "time"
+    return "text"
+
+
+def _domain_size(col: str, kind: str, column_stats: "dict | None", rows: int) -> int:
+    if column_stats and column_stats["n_distinct"]:
+        n_distinct = column_stats["n_distinct"]
+        return max(1, int(-n_distinct * rows if n_distinct < 0 else n_distinct))
+    if kind == "time":
+        return rows
+    rank = cardinality_rank(col)
+    if rank == 3:
+        return max(1, rows // 10)
+    if rank == 1:
+        return 5
+    return 1000 if kind in ("int", "real") else 100
+
+
+def _domain(col: str, kind: str, size: int, literals: list) -> list:
+    """Distinct values for a column; the query's own literals come first (the hottest under zipf)."""
+    values = list(dict.fromkeys(literals))
+    if kind in ("int", "real"):
+        generated = range(1, size + 1)
+    elif kind == "time":
+        step = timedelta(days=365) / size
+        generated = ((VERIFY_EPOCH + step * i).strftime("%Y-%m-%d %H:%M:%S") for i in range(size))
+    else:
+        generated = (f"{col}_{i}" for i in range(size))
+    seen = set(values)
+    for value in generated:
+        if len(values) >= size:
+            break
+        if value not in seen:
+            values.append(value)
+    return values
+
+
+def query_tables(query: str, catalog: dict) -> dict[str, list[str]]:
+    """Tables a query touches and the columns a synthetic copy needs.
+
+    Uses the catalog's full column list when the table is known; otherwise
+    every column the query names, attributed through its aliases.
+    """
+    aliases = table_aliases(query)
+    if not aliases:
+        return {}
+    first = next(iter(aliases.values()))
+    tables: dict[str, dict[str, None]] = {table: {} for table in aliases.values()}
+    for table, (where_cols, join_cols, order_cols) in table_columns(query).items():
+        for col in [c for c, _ in where_cols] + join_cols + [c for c, _ in order_cols]:
+            tables[table][col] = None
+    for qualifier, col in QUALIFIED_COL_RE.findall(query):
+        if qualifier.lower() in aliases:
+            tables[aliases[qualifier.lower()]][col] = None
+    m = SELECT_LIST_RE.search(query)
+    if m:
+        for item in _split_top_level(m.group(1)):
+            if re.fullmatch(r"\w+", item) and item != "*":
+                tables[first][item] = None
+    m = UPDATE_SET_RE.search(query) if query.lstrip().upper().startswith("UPDATE") else None
+    if m:
+        for assignment in _split_top_level(m.group(1)):
+            col = assignment.split("=", 1)[0].strip().split(".")[-1]
+            if re.fullmatch(r"\w+", col):
+                tables[first][col] = None
+    result = {}
+    for table, columns in tables.items():
+        known = catalog.get(table.lower(), {}).get("columns", {})
+        names = list(known) if known else list(columns)
+        result[table] = [name for name in names if name.lower() not in {"and", "or", "not", "null"}]
+    return result
+
+
+def build_verify_db(query: str, catalog: dict, stats: dict, rows: int, distribution: str,
+                    seed: int, zipf_s: float = ZIPF_S) -> tuple[sqlite3.Connection, dict]:
+    """In-memory SQLite copy of the query's tables filled with seeded synthetic rows.
+
+    Column domains follow ``stats`` when available (n_distinct, null_frac),
+    else name heuristics; the query's own literals are part of each domain
+    so predicates select real rows. ``zipf`` makes early domain values
+    (the literals first) hot, ``uniform`` spreads rows evenly. Existing
+    plain B-tree indexes from the catalog are created too. Returns the
+    connection and each ``(table, column)``'s generated values.
+    """
+    rng = random.Random(seed)
+    literals: dict[str, list] = {}
+    for col, raw in LITERAL_RE.findall(query):
+        value = raw[1:-1].replace("''", "'") if raw.startswith("'") else (float(raw) if "." in raw else int(raw))
+        literals.setdefault(col.lower(), []).append(value)
+
+    conn = sqlite3.connect(":memory:")
+    generated_values: dict[tuple[str, str], list] = {}
+    for table, columns in query_tables(query, catalog).items():
+        table_entry = catalog.get(table.lower(), {})
+        table_stats = stats.get(table.lower(), {})
+        generated = [col for col in columns if col.lower() != "id"]
+        kinds = {
+            col: _column_kind(col, table_entry.get("columns", {}).get(col.lower(), ""), literals.get(col.lower(), []))
+            for col in generated
+        }
+        sql_types = {"int": "INTEGER", "real": "REAL", "time": "TEXT", "text": "TEXT"}
+        ddl = ", ".join(["id INTEGER PRIMARY KEY"] + [f'"{col}" {sql_types[kinds[col]]}' for col in generated])
+        conn.execute(f'CREATE TABLE "{table}" ({ddl})')
+
+        data = []
+        for col in generated:
+            column_stats = table_stats.get(col.lower())
+            domain = _domain(col, kinds[col], _domain_size(col, kinds[col], column_stats, rows),
+                             literals.get(col.lower(), []))
+            if distribution == "zipf":
+                weights = [1 / (k ** zipf_s) for k in range(1, len(domain) + 1)]
+                values = rng.choices(domain, weights=weights, k=rows)
+            else:
+                values = rng.choices(domain, k=rows)
+            null_frac = column_stats["null_frac"] if column_stats else 0.0
+            if null_frac:
+                values = [None if rng.random() < null_frac else value for value in values]
+            data.append(values)
+            generated_values[(table.lower(), col.lower())] = values
+        placeholders = ", ".join("?" * (len(generated) + 1))
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})',
+                         zip(range(1, rows + 1), *data) if data else ((i,) for i in range(1, rows + 1)))
+        generated_values[(table.lower(), "id")] = list(range(1, rows + 1))
+        for index in table_entry.get("indexes", []):
+            cols = [col for col, direction in index["columns"] if direction != "EXPR"]
+            if _plain_btree(index) and cols and len(cols) == len(index["columns"]) and all(c in columns for c in cols):
+                conn.execute(f'CREATE INDEX "{index["name"]}" ON "{table}" ({", ".join(cols)})')
+    conn.execute("ANALYZE")
+    return conn, generated_values
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def bind_placeholders(query: str, generated_values: dict, seed: int = 0) -> str:
+    """Replace a fingerprint's ``?`` / ``$n`` / ``%s`` parameters with values from the synthetic data.
+
+    Equality parameters get a value drawn from the column's rows (so zipf
+    data yields hot values), range and BETWEEN bounds the column's median
+    or quartiles, LIMIT/OFFSET 10/0. Parameters that bind to no known
+    column are left in place.
+    """
+    rng = random.Random(seed)
+    aliases = table_aliases(query)
+    tables = list(dict.fromkeys(aliases.values()))
+    repeated: dict[str, str] = {}
+
+    def column_values(qualifier, col) -> list:
+        candidates = [aliases[qualifier.lower()]] if qualifier and qualifier.lower() in aliases else tables
+        for table in candidates:
+            values = generated_values.get((table.lower(), col.lower()))
+            if values is not None:
+                return sorted(v for v in values if v is not None)
+        return []
+
+    def literal(param: str, make) -> str:
+        if param.startswith("$") and param in repeated:
+            return repeated[param]
+        text = make()
+        if text is not None and param.startswith("$"):
+            repeated[param] = text
+        return text if text is not None else param
+
+    def bound(m):
+        values = column_values(m.group(1), m.group(2))
+        op = m.group(3).upper()
+
+        def make():
+            if not values:
+                return None
+            if op in {"=", "<>", "!="} or op.startswith("IN") or op == "LIKE":
+                return _sql_literal(rng.choice(values))
+            return _sql_literal(values[len(values) // 2])
+        return m.group(0)[:m.start(4) - m.start(0)] + literal(m.group(4), make)
+
+    def between(m):
+        values = column_values(m.group(1), m.group(2))
+        low = literal(m.group(3), lambda: _sql_literal(values[len(values) // 4]) if values else None)
+        high = literal(m.group(4), lambda: _sql_literal(values[len(values) * 3 // 4]) if values else None)
+        return f"{m.group(0)[:m.start(3) - m.start(0)]}{low} AND {high}"
+
+    query = BETWEEN_PARAM_RE.sub(between, query)
+    query = BOUND_PARAM_RE.sub(bound, query)
+    return PAGING_PARAM_RE.sub(lambda m: f"{m.group(1)} {10 if m.group(1).upper() == 'LIMIT' else 0}", query)
+
+
+def _explain(conn: sqlite3.Connection, query: str) -> list[str]:
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+def _best_time_ms(conn: sqlite3.Connection, query: str, repeat: int) -> float:
+    best = math.inf
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        conn.execute(query).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def verify_index(query: str, create_index: str, catalog: "dict | None" = None, stats: "dict | None" = None,
+                 rows: int = VERIFY_ROWS, distribution: str = "uniform", seed: int = 0,
+                 repeat: int = VERIFY_REPEAT) -> dict:
+    """Measure a suggested index in SQLite: plan and best-of-``repeat`` time before and after.
+
+    Fingerprints are verified too: their parameters are bound to values
+    from the synthetic data first.
+    """
+    try:
+        conn, generated_values = build_verify_db(query, catalog or {}, stats or {}, rows, distribution, seed)
+        bound_query = bind_placeholders(query, generated_values, seed)
+        unbound = PLACEHOLDER_RE.search(bound_query)
+        if unbound:
+            return {"error": f"cannot bind parameter {unbound.group(0)} to a column"}
+        was_bound = bound_query != query
+        query = bound_query
+        plan_before = _explain(conn, query)
+        before_ms = _best_time_ms(conn, query, repeat)
+        conn.execute(create_index.rstrip(";"))
+        conn.execute("ANALYZE")
+        plan_after = _explain(conn, query)
+        after_ms = _best_time_ms(conn, query, repeat)
+    except sqlite3.Error as exc:
+        return {"error": f"not runnable in SQLite: {exc}"}
+    index_name = create_index.split()[2]
+    return {
+        "rows": rows,
+        "distribution": distribution,
+        "seed": seed,
+        "bound_query": query if was_bound else None,
+        "plan_before": plan_before,
+        "plan_after": plan_after,
+        "before_ms": round(before_ms, 3),
+        "after_ms": round(after_ms, 3),
+        "speedup": round(before_ms / after_ms, 1) if after_ms else None,
+        "index_used": any(index_name in step for step in plan_after),
+    }
+
+
+def print_verification(result: dict, indent: str = "   "):
+    if "error" in result:
+        print(f"{indent}⚠️  Verification skipped: {result['error']}")
+        return
+    print(f"{indent}🧪 SQLite check ({result['rows']:,} rows/table, {result['distribution']}, seed {result['seed']}):")
+    if result["bound_query"]:
+        print(f"{indent}   Bound:  {result['bound_query'][:160]}")
+    print(f"{indent}   Before: {' | '.join(result['plan_before'])} — {result['before_ms']:.2f} ms")
+    print(f"{indent}   After:  {' | '.join(result['plan_after'])} — {result['after_ms']:.2f} ms")
+    verdict = "✅ index used" if result["index_used"] else "❌ planner ignored the index"
+    print(f"{indent}   Speedup: {result['speedup']}x  {verdict}")
+
+
 def generate_create_index(table: str, columns: list[tuple[str, str]]) -> str:
     if not columns:
         return ""
@@ -141,10 +1135,61 @@ def main():
     parser = argparse.ArgumentParser(
         description="Recommend database indexes from SQL query analysis."
     )
-    parser.add_argument("--table", required=True, help="Table name to index")
-    parser.add_argument("--query", required=True, help="SQL SELECT query to analyze")
+    parser.add_argument("--table", help="Table name to index")
+    parser.add_argument("--query", help="SQL SELECT query to analyze")
+    parser.add_argument("--workload", default=None,
+                        help="Batch mode: .sql script, NDJSON of {query, count, total_ms}, or "
+                             "slow_query_analyzer.py --json output")
+    parser.add_argument("--max-per-table", type=int, default=MAX_INDEXES_PER_TABLE,
+                        help=f"Consolidated indexes to suggest per table in --workload mode "
+                             f"(default: {MAX_INDEXES_PER_TABLE})")
+    parser.add_argument("--schema", action="append", default=[], metavar="FILE",
+                        help="DDL script (CREATE TABLE/INDEX) or pg_indexes CSV export; repeatable. "
+                             "Suppresses suggestions existing indexes already cover")
+    parser.add_argument("--rows", action="append", default=[], metavar="TABLE=N",
+                        help="Row count for a table, used to estimate index size; repeatable")
+    parser.add_argument("--stats", action="append", default=[], metavar="FILE",
+                        help="pg_stats CSV export (tablename, attname, null_frac, n_distinct, most_common_freqs); "
+                             "orders columns by measured selectivity. Repeatable")
+    parser.add_argument("--sample-csv", action="append", default=[], metavar="TABLE=FILE",
+                        help="Sample rows of TABLE (CSV with header) to profile for column statistics; repeatable")
+    parser.add_argument("--verify", action="store_true",
+                        help="Measure each suggestion offline: build synthetic tables in in-memory SQLite and "
+                             "compare EXPLAIN QUERY PLAN and timing before/after the index")
+    parser.add_argument("--verify-rows", type=int, default=VERIFY_ROWS,
+                        help=f"Synthetic rows per table for --verify (default: {VERIFY_ROWS:,})")
+    parser.add_argument("--distribution", choices=("uniform", "zipf"), default="uniform",
+                        help="Value distribution of synthetic columns for --verify (default: uniform)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --verify data (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Output --workload recommendations as JSON")
     args = parser.parse_args()
 
+    catalog = load_schema(args.schema)
+    row_counts = parse_row_counts(args.rows)
+    stats: dict[str, dict[str, dict]] = {}
+    for path in args.stats:
+        for name, columns in load_pg_stats(path).items():
+            stats.setdefault(name, {}).update(columns)
+    for value in args.sample_csv:
+        name, _, path = value.partition("=")
+        columns, sampled = profile_sample_csv(path)
+        stats.setdefault(name.strip().lower(), {}).update(columns)
+        row_counts.setdefault(name.strip().lower(), sampled)
+    if args.workload:
+        entries = load_workload(args.workload)
+        shapes = dedupe_workload(entries)
+        verify = None
+        if args.verify:
+            verify = {"rows": args.verify_rows, "distribution": args.distribution, "seed": args.seed}
+        report = recommend_workload(shapes, args.max_per_table, catalog, row_counts, stats, verify)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_workload_report(report, len(shapes), sum(entry["count"] for entry in entries))
+        return
+    if not args.table or not args.query:
+        parser.error("--table and --query are required unless --workload is given")
+
     query = args.query
     table = args.table
 
@@ -164,16 +1209,38 @@ def main():
     if order_cols:
         print(f"  ORDER columns: {[c for c, _ in order_cols]}")
 
-    index_cols = build_index_columns(where_cols, join_cols, order_cols)
+    table_stats = stats.get(table.lower())
+    rows = row_counts.get(table.lower(), DEFAULT_ROWS)
+    rank = selectivity_rank(table_stats, rows) if table_stats else cardinality_rank
+    index_cols = build_index_columns(where_cols, join_cols, order_cols, rank)
 
     if not index_cols:
         print("\n⚠️  No indexable columns detected. Verify query contains WHERE/JOIN/ORDER BY.")
         sys.exit(1)
 
+    table_entry = catalog.get(table.lower())
+    existing = covering_index(table_entry, {"columns": index_cols, "eq_len": _eq_prefix_len(index_cols, where_cols)})
+    if existing is not None:
+        cols = ", ".join(c for c, _ in existing["columns"])
+        print(f"\n✅ Existing index {existing['name']} ({cols}) already covers this query; nothing to add.")
+        return
+
     sql = generate_create_index(table, index_cols)
 
     print(f"\n💡 Recommended Index:")
     print(f"   {sql}")
+    if table.lower() in row_counts:
+        size = estimate_index_bytes([c for c, _ in index_cols], (table_entry or {}).get("columns", {}),
+                                    row_counts[table.lower()])
+        print(f"   Estimated size: ≈{human_bytes(size)} for {row_counts[table.lower()]:,} rows")
+    for old in superseded_indexes(table_entry, index_cols):
+        print(f"   Supersedes {old['name']} — drop it once this index is built.")
+    if table_stats:
+        eq_len = _eq_prefix_len(index_cols, where_cols)
+        scanned = estimate_rows_scanned(index_cols, eq_len, table_stats, rows)
+        print(f"   Estimated rows scanned: ≈{scanned:,} of {rows:,}")
+        for col, _ in index_cols[:eq_len]:
+            print(f"     {col}: equality selectivity {equality_selectivity(table_stats.get(col.lower()), rows, col):.2e}")
 
     # Explain the reasoning
     eq_names = [c for c, op in where_cols if op == "eq"]
@@ -181,11 +1248,15 @@ def main():
     ord_names = [c for c, _ in order_cols]
 
     if eq_names:
-        print(f"\n   Equality predicates ({eq_names}) placed first.")
+        ordering = "by measured selectivity" if table_stats else "by estimated cardinality"
+        print(f"\n   Equality predicates ({eq_names}) placed first, {ordering}.")
     if rng_names:
         print(f"   Range predicates ({rng_names}) placed after equality (index range scan).")
     if ord_names:
         print(f"   ORDER BY columns ({ord_names}) placed last to avoid filesort.")
+    if args.verify:
+        print()
+        print_verification(verify_index(query, sql, catalog, stats, args.verify_rows, args.distribution, args.seed))
 
     print("\n✅ Apply with care on large tables — prefer CONCURRENTLY for PostgreSQL.")
 
@@ -1,70 +1,997 @@
 #!/usr/bin/env python3
 import argparse
+import glob
+import gzip
+import heapq
 import json
+import math
+import mmap
+import os
 import re
-from collections import Counter
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
+from pathlib import Path
+
+from index_recommender import build_index_columns, generate_create_index, parse_where_cols
 
 
 DURATION_RE = re.compile(r"duration:\s*([0-9.]+)\s*ms", re.IGNORECASE)
 STATEMENT_RE = re.compile(r"statement:\s*(.+)$", re.IGNORECASE)
+SLOWEST_N = 20
+HISTOGRAM_GROWTH = 1.1  # bucket width; quantiles are within ~5% of the true value
+HISTOGRAM_MIN_MS = 0.001
+BURST_WINDOW_S = 1.0
+# A session silent for this long in log time is forgotten; a statement whose
+# duration arrives later than this is not paired with it.
+SESSION_IDLE_S = 3600.0
+FOLLOW_WINDOW_S = 300.0
+FOLLOW_INTERVAL_S = 10.0
+FOLLOW_POLL_S = 0.5
+FOLLOW_READ_BYTES = 8 * 1024 * 1024
+
+# auto_explain plan checks
+SEQ_SCAN_MIN_ROWS = 1000
+FILTER_DISCARD_RATIO = 0.9
+NESTED_LOOP_MAX_LOOPS = 1000
+MISESTIMATE_FACTOR = 10
+PLAN_DETAILS_N = 5
+PLAN_CAST_RE = re.compile(r"::[a-z_ ]+(?:\(\d+(?:,\d+)?\))?(?:\[\])?")
+PLAN_PAREN_IDENT_RE = re.compile(r"\(([\w.]+)\)")
+FINGERPRINT_CACHE_SIZE = 65536
+CHUNK_MB = 64
+LOG_LINE_PREFIX = "%m [%p] "
+
+# log_line_prefix escapes (PostgreSQL docs, "What to Log") and what each expands to.
+TIMESTAMP_PATTERN = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?(?: [A-Za-z0-9+:-]+)?"
+PREFIX_ESCAPES = {
+    "a": r".*?", "u": r"\S*?", "d": r"\S*?", "r": r"\S*?", "h": r"\S*?", "b": r".*?", "i": r".*?",
+    "p": r"\d+", "P": r"\d*", "c": r"[0-9a-f]+\.[0-9a-f]+", "l": r"\d+",
+    "t": TIMESTAMP_PATTERN, "m": TIMESTAMP_PATTERN, "s": TIMESTAMP_PATTERN, "n": r"\d+\.\d+",
+    "e": r"[0-9A-Z]{5}", "v": r"\S*?", "x": r"\d*", "Q": r"-?\d*", "q": "", "%": "%",
+}
+# Escapes whose first occurrence is captured as a named group.
+PREFIX_CAPTURES = {"p": "pid", "c": "session", "m": "ts", "t": "ts", "n": "ts"}
+RECORD_DURATION_RE = re.compile(r"duration:\s*([0-9.]+)\s*ms\s*(.*)", re.IGNORECASE | re.DOTALL)
+RECORD_STATEMENT_RE = re.compile(r"(?:statement|execute [^:]*):\s*(.*)", re.IGNORECASE | re.DOTALL)
+
+# The leading lookahead lets the scanner skip ordinary identifier/keyword
+# characters without trying every alternative at each position.
+SQL_LEXEME_RE = re.compile(
+    r"""
+    (?=[-/"`'$%:\d.]|[EeBbXxNnUu]&?')
+    (?:
+      (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<quoted>"(?:[^"]|"")*"?|`[^`]*`?)
+    | (?P<literal>
+          (?<![\w$])[Ee]'(?:[^'\\]|''|\\.)*'?
+        | (?:(?<![\w$])(?:[BbXxNn]|[Uu]&))?'(?:[^']|'')*'?
+        | \$\$.*?(?:\$\$|\Z)
+        | \$(?P<tag>[A-Za-z_]\w*)\$.*?(?:\$(?P=tag)\$|\Z)
+        | \$\d+ | %s | %\(\w+\)s | (?<![\w:]):[A-Za-z_]\w*
+        | (?<![\w$.])(?:0[xX][0-9A-Fa-f]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?![\w$])
+      )
+    )
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+WHITESPACE_RE = re.compile(r"\s{2,}|[^\S ]")
+PLACEHOLDER_TUPLE = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+IN_LIST_RE = re.compile(r"\bin\s*" + PLACEHOLDER_TUPLE)
+VALUES_ROWS_RE = re.compile(r"\b(values\s*" + PLACEHOLDER_TUPLE + r")(?:\s*,\s*" + PLACEHOLDER_TUPLE + r")+")
 
 
+def _lexeme(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "comment":
+        return " "
+    if kind == "quoted":
+        return match.group(0)
+    return "?"
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
 def normalize_sql(sql: str) -> str:
-    collapsed = re.sub(r"\s+", " ", sql.strip())
-    collapsed = re.sub(r"'[^']*'", "?", collapsed)
-    collapsed = re.sub(r"\b\d+\b", "?", collapsed)
-    return collapsed.lower()
+    """Fingerprint a statement.
 
+    A single lexer pass drops comments and replaces string, dollar-quoted and
+    numeric (incl. hex/float) literals and bind parameters (``$1``, ``%s``,
+    ``:name``) with ``?``, leaving quoted identifiers intact. Whitespace is
+    then collapsed, ``IN (...)`` placeholder lists of any length become
+    ``in (?)`` and multi-row ``VALUES`` collapse to their first row. Results
+    are memoized in a bounded LRU cache since ORMs repeat raw statements.
+    """
+    fingerprint = WHITESPACE_RE.sub(" ", SQL_LEXEME_RE.sub(_lexeme, sql)).strip().lower()
+    if "(?" in fingerprint or "( ?" in fingerprint:
+        fingerprint = IN_LIST_RE.sub("in (?)", fingerprint)
+        fingerprint = VALUES_ROWS_RE.sub(r"\1", fingerprint)
+    return fingerprint
 
-def analyze(log_file: str, threshold_ms: float, n1_threshold: int):
-    slow_queries = []
-    statements = []
 
-    with open(log_file, "r", encoding="utf-8", errors="ignore") as handle:
-        for line in handle:
-            duration_match = DURATION_RE.search(line)
-            statement_match = STATEMENT_RE.search(line)
-            if not duration_match or not statement_match:
-                continue
+def compile_line_prefix(line_prefix: str) -> re.Pattern:
+    """Turn a ``log_line_prefix`` setting into a regex matching the start of a log record.
+
+    The first ``%m``/``%t``/``%n`` is captured as ``ts`` (the log time of the
+    record); ``%p`` and ``%c`` are captured as ``pid`` and ``session``.
+    """
+    parts = ["^"]
+    captured: set[str] = set()
+    i = 0
+    while i < len(line_prefix):
+        char = line_prefix[i]
+        if char == "%" and i + 1 < len(line_prefix):
+            escape = line_prefix[i + 1]
+            pattern = PREFIX_ESCAPES.get(escape, re.escape("%" + escape))
+            name = PREFIX_CAPTURES.get(escape)
+            if name and name not in captured:
+                pattern = f"(?P<{name}>{pattern})"
+                captured.add(name)
+            parts.append(pattern)
+            i += 2
+            continue
+        parts.append(re.escape(char))
+        i += 1
+    parts.append(r"(?P<level>[A-Z]+[0-9]?):\s+(?P<message>.*)")
+    return re.compile("".join(parts))
+
+
+@lru_cache(maxsize=4096)
+def _epoch_second(stamp: str) -> float:
+    return datetime.fromisoformat(stamp).timestamp()
+
+
+def parse_log_timestamp(stamp: "str | None") -> "float | None":
+    """Seconds since the epoch for a ``%m``/``%t``/``%n`` value; the zone suffix is ignored."""
+    if not stamp:
+        return None
+    if stamp[4:5] != "-":
+        return float(stamp)
+    seconds = _epoch_second(stamp[:19])
+    if stamp[19:20] == ".":
+        seconds += float(stamp[19:].split(" ", 1)[0])
+    return seconds
+
+
+def plan_predicate_columns(*conditions: "str | None") -> list[tuple[str, str]]:
+    """(column, eq|range) pairs from EXPLAIN ``Filter``/``Index Cond`` text.
 
+    PostgreSQL prints predicates like ``((status)::text = 'paid'::text)``;
+    casts and parenthesised identifiers are stripped and pattern operators
+    mapped back to SQL so ``index_recommender.parse_where_cols`` can read them.
+    """
+    clauses = []
+    for condition in conditions:
+        if not condition:
+            continue
+        text = PLAN_CAST_RE.sub("", condition)
+        previous = None
+        while previous != text:
+            previous, text = text, PLAN_PAREN_IDENT_RE.sub(r"\1", text)
+        clauses.append(text.replace("!~~", " NOT LIKE ").replace("~~*", " LIKE ").replace("~~", " LIKE "))
+    return parse_where_cols("WHERE " + " AND ".join(clauses)) if clauses else []
+
+
+def analyze_plan(plan: dict) -> list[tuple[str, str, "str | None"]]:
+    """Walk an auto_explain JSON plan; return (issue, detail, suggested CREATE INDEX or None)."""
+    findings = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        children = node.get("Plans", [])
+        stack.extend(children)
+        node_type = node.get("Node Type", "")
+        relation = node.get("Relation Name")
+        loops = node.get("Actual Loops", 1) or 1
+        rows = node.get("Actual Rows", node.get("Plan Rows", 0))
+        removed = node.get("Rows Removed by Filter", 0)
+        predicate = node.get("Filter")
+
+        if node_type == "Seq Scan" and (rows + removed) * loops >= SEQ_SCAN_MIN_ROWS:
+            suggestion = None
+            columns = build_index_columns(plan_predicate_columns(predicate), [], [])
+            if relation and columns:
+                suggestion = generate_create_index(relation, columns)
+            where = f" filtering {predicate}" if predicate else ""
+            findings.append(("seq_scan", f"Seq Scan on {relation} read {(rows + removed) * loops:,} rows{where}",
+                             suggestion))
+        elif removed and removed * loops >= SEQ_SCAN_MIN_ROWS and removed / (removed + rows) >= FILTER_DISCARD_RATIO:
+            suggestion = None
+            columns = build_index_columns(plan_predicate_columns(node.get("Index Cond"), predicate), [], [])
+            if relation and columns:
+                suggestion = generate_create_index(relation, columns)
+            findings.append(("rows_removed", f"{node_type} on {relation} discarded "
+                             f"{removed / (removed + rows):.0%} of rows by {predicate}", suggestion))
+
+        if node.get("Sort Space Type") == "Disk":
+            keys = ", ".join(node.get("Sort Key", []))
+            findings.append(("disk_sort", f"Sort on ({keys}) spilled {node.get('Sort Space Used', 0):,} kB to disk "
+                             f"({node.get('Sort Method', 'external')})", None))
+
+        if node_type == "Nested Loop" and len(children) > 1:
+            inner = children[1]
+            inner_loops = inner.get("Actual Loops", 0)
+            planned = node.get("Plan Rows", 0) or 1
+            actual = node.get("Actual Rows")
+            if inner_loops >= NESTED_LOOP_MAX_LOOPS:
+                findings.append(("nested_loop", f"Nested Loop ran inner {inner.get('Node Type')} on "
+                                 f"{inner.get('Relation Name', '?')} {inner_loops:,} times", None))
+            elif actual is not None and actual * loops >= SEQ_SCAN_MIN_ROWS and actual >= planned * MISESTIMATE_FACTOR:
+                findings.append(("nested_loop", f"Nested Loop returned {actual:,} rows vs {planned:,} estimated "
+                                 f"({actual / planned:.0f}x misestimate)", None))
+    return findings
+
+
+class LogRecordAssembler:
+    """Reassemble PostgreSQL log records into ``(duration_ms, statement, session, ts)`` tuples.
+
+    A record starts with a line matching ``log_line_prefix``; following lines
+    that begin with whitespace (PostgreSQL indents embedded newlines with a
+    tab) are continuations. ``duration: X ms  statement: ...`` records yield
+    directly. With ``log_statement`` + ``log_duration`` the statement and its
+    duration arrive as separate records, so statements wait per session until
+    the matching duration-only record. The session is the ``%c`` session id
+    if the prefix has one, else the ``%p`` pid; ``ts`` is the record's log
+    time in epoch seconds. Lines that don't match the prefix fall back to the
+    single-line ``duration ... statement:`` form used by ORM logs, with no
+    session or time. ``auto_explain`` records (``duration: X ms  plan:``
+    followed by JSON) yield the plan's query text with the parsed plan as a
+    fifth element. Only the current record and one pending statement per
+    session are buffered.
+
+    When a log is split into chunks, a pair can straddle the boundary:
+    ``pending`` holds statements (with their log time) still waiting at the
+    end of a chunk, ``orphans`` the first duration per session that arrived
+    before any statement, and ``seen`` the last log time of every session
+    with a split record, so ``QueryStats.merge`` can join them back up.
+    Sessions silent for ``SESSION_IDLE_S`` of log time are dropped from
+    ``seen`` and ``pending``, and orphans are only kept from the first
+    ``SESSION_IDLE_S`` of the stream, so memory follows the sessions active
+    recently rather than every connection in the log. Without a log time in
+    the prefix nothing can be aged out.
+    """
+
+    def __init__(self, line_prefix: str = LOG_LINE_PREFIX):
+        self.record_re = compile_line_prefix(line_prefix)
+        self._session: "str | None" = None
+        self._ts: "str | None" = None
+        self._level = ""
+        self._lines: list[str] = []
+        self.pending: dict["str | None", tuple[str, "float | None"]] = {}
+        self.orphans: dict["str | None", tuple[float, "float | None"]] = {}
+        self.seen: dict["str | None", "float | None"] = {}
+        self._start: "float | None" = None
+        self._swept: "float | None" = None
+
+    def feed(self, line: str):
+        line = line.rstrip("\r\n")
+        if self._lines and line[:1] in (" ", "\t"):
+            self._lines.append(line[1:] if line[0] == "\t" else line)
+            return
+        yield from self.close()
+        record = self.record_re.match(line)
+        if record:
+            fields = record.groupdict()
+            self._session = fields.get("session") or fields.get("pid")
+            self._ts = fields.get("ts")
+            self._level = fields["level"]
+            self._lines.append(record.group("message"))
+            return
+        duration_match = DURATION_RE.search(line)
+        statement_match = STATEMENT_RE.search(line)
+        if duration_match and statement_match:
+            yield float(duration_match.group(1)), statement_match.group(1).strip(), None, None
+
+    def close(self):
+        """Emit the record being assembled, if any."""
+        if not self._lines:
+            return
+        message = "\n".join(self._lines)
+        self._lines = []
+        if self._level != "LOG":
+            return
+        duration_match = RECORD_DURATION_RE.match(message)
+        session = self._session
+        ts = parse_log_timestamp(self._ts)
+        if ts is not None:
+            self._age(ts)
+        if duration_match:
             duration = float(duration_match.group(1))
-            sql = statement_match.group(1).strip()
-            statements.append(sql)
-
-            if duration >= threshold_ms:
-                slow_queries.append({
-                    "duration_ms": duration,
-                    "statement": sql
-                })
-
-    normalized_counter = Counter(normalize_sql(stmt) for stmt in statements)
-    n_plus_one_candidates = [
-        {"statement": stmt, "count": count}
-        for stmt, count in normalized_counter.items()
-        if count >= n1_threshold and "select" in stmt
-    ]
-    n_plus_one_candidates.sort(key=lambda item: item["count"], reverse=True)
-
-    slow_queries.sort(key=lambda item: item["duration_ms"], reverse=True)
-    summary = {
-        "total_statements": len(statements),
-        "slow_query_threshold_ms": threshold_ms,
-        "slow_query_count": len(slow_queries),
-        "slowest_queries": slow_queries[:20],
-        "n_plus_one_candidates": n_plus_one_candidates[:20]
-    }
-    return summary
+            rest = duration_match.group(2)
+            if not rest:
+                waiting = self.pending.pop(session, None)
+                if waiting is not None:
+                    if within_session_idle(waiting[1], ts):
+                        yield duration, waiting[0], session, ts
+                elif (session not in self.seen and session not in self.orphans
+                        and within_session_idle(self._start, ts)):
+                    self.orphans[session] = (duration, ts)
+                self.seen[session] = ts
+                return
+            statement_match = RECORD_STATEMENT_RE.match(rest)
+            if statement_match:
+                yield duration, statement_match.group(1).strip(), session, ts
+            elif rest.startswith("plan:"):
+                try:
+                    explained = json.loads(rest[5:])
+                except ValueError:
+                    return  # text-format plan
+                if isinstance(explained, dict) and "Plan" in explained:
+                    sql = explained.get("Query Text", "").strip()
+                    yield duration, sql, session, ts, explained["Plan"]
+            return
+        statement_match = RECORD_STATEMENT_RE.match(message)
+        if statement_match:
+            self.pending[session] = (statement_match.group(1).strip(), ts)
+            self.seen[session] = ts
+
+    def _age(self, ts: float):
+        if self._start is None:
+            self._start = ts
+        if self._swept is None or ts - self._swept > SESSION_IDLE_S:
+            forget_idle_sessions(self.seen, self.pending, ts)
+            self._swept = ts
+
+
+def within_session_idle(earlier: "float | None", later: "float | None") -> bool:
+    return earlier is None or later is None or later - earlier <= SESSION_IDLE_S
+
+
+def forget_idle_sessions(seen: dict, pending: dict, now: float):
+    """Drop sessions and waiting statements older than ``SESSION_IDLE_S`` before ``now``."""
+    for session in [session for session, ts in seen.items() if not within_session_idle(ts, now)]:
+        del seen[session]
+    for session in [session for session, (_, ts) in pending.items() if not within_session_idle(ts, now)]:
+        del pending[session]
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram; mergeable, fixed relative error.
+
+    Bucket ``i`` counts durations in ``(GROWTH**(i-1), GROWTH**i]`` ms, so a
+    fingerprint seen millions of times still needs only a few dozen buckets
+    and two histograms merge by adding counts.
+    """
+
+    _LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+    def __init__(self):
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+
+    def add(self, duration_ms: float):
+        index = math.ceil(math.log(max(duration_ms, HISTOGRAM_MIN_MS)) / self._LOG_GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Geometric midpoint of the bucket holding the ``q``-th duration."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return HISTOGRAM_GROWTH ** (index - 0.5)
+        return HISTOGRAM_GROWTH ** (max(self.buckets) - 0.5)
+
+
+class BurstTracker:
+    """Session-aware N+1 detection.
+
+    Within each session, consecutive executions of the same fingerprint form
+    a run as long as each follows the previous within ``window_s`` seconds
+    (statements without a log time only need to be consecutive). A run of at
+    least ``min_size`` SELECTs is a burst; bursts are aggregated per
+    ``(parent, fingerprint)``, where the parent is the statement the session
+    ran just before the run - usually the query whose rows the loop walks.
+
+    The first run of each session has no known parent until it is merged
+    behind the preceding chunk, so it is held back in ``heads`` (or is still
+    the open run) and resolved by ``merge``. Only runs starting within
+    ``window_s`` of the tracker's first record can continue an earlier
+    chunk's run; later first runs, and runs after the session was idle for
+    more than ``window_s``, have no parent. Open runs idle that long are
+    closed and dropped as the log time advances, so only recently active
+    sessions are held.
+    """
+
+    # Run layout: [fingerprint, size, first_ts, last_ts, total_ms, parent]
+    UNKNOWN = object()
+
+    def __init__(self, window_s: float = BURST_WINDOW_S, min_size: int = 5):
+        self.window_s = window_s
+        self.min_size = min_size
+        self.open: dict["str | None", list] = {}
+        self.heads: dict["str | None", list] = {}
+        self.bursts: dict[tuple["str | None", str], dict] = {}
+        self.start_ts: "float | None" = None
+        self.clock: "float | None" = None
+        self._swept: "float | None" = None
+
+    def _follows(self, run: list, ts: "float | None") -> bool:
+        return ts is None or run[3] is None or ts - run[3] <= self.window_s
+
+    def _continues(self, run: list, fingerprint: str, ts: "float | None") -> bool:
+        return run[0] == fingerprint and self._follows(run, ts)
+
+    def _first_parent(self, ts: "float | None"):
+        """Parent of a session's first run: unknown only if an earlier chunk's run could still precede it."""
+        if ts is None or self.start_ts is None or ts - self.start_ts <= self.window_s:
+            return self.UNKNOWN
+        return None
+
+    def _close(self, session: "str | None", run: list):
+        if run[5] is self.UNKNOWN and session not in self.heads:
+            self.heads[session] = run
+        else:
+            self._record(self.bursts, run)
+
+    def _tick(self, ts: float):
+        if self.start_ts is None:
+            self.start_ts = ts
+        if self.clock is None or ts > self.clock:
+            self.clock = ts
+        if self._swept is None or self.clock - self._swept > self.window_s:
+            self.expire(self.clock)
+            self._swept = self.clock
+
+    def expire(self, now: float):
+        """Close and drop open runs that no statement at or after ``now`` can extend."""
+        idle = [session for session, run in self.open.items() if run[3] is not None and now - run[3] > self.window_s]
+        for session in idle:
+            self._close(session, self.open.pop(session))
+
+    def _record(self, bursts: dict, run: list):
+        fingerprint, size, _, _, total_ms, parent = run
+        if size < self.min_size or "select" not in fingerprint:
+            return
+        key = (None if parent is self.UNKNOWN else parent, fingerprint)
+        agg = bursts.get(key)
+        if agg is None:
+            agg = bursts[key] = {"bursts": 0, "queries": 0, "max_size": 0, "total_ms": 0.0}
+        agg["bursts"] += 1
+        agg["queries"] += size
+        agg["max_size"] = max(agg["max_size"], size)
+        agg["total_ms"] += total_ms
+
+    def observe(self, session: "str | None", ts: "float | None", fingerprint: str, duration: float):
+        if ts is not None:
+            self._tick(ts)
+        run = self.open.get(session)
+        if run is not None and self._continues(run, fingerprint, ts):
+            run[1] += 1
+            run[3] = ts
+            run[4] += duration
+            return
+        if run is not None:
+            self._close(session, run)
+            parent = run[0] if self._follows(run, ts) else None
+        else:
+            parent = self._first_parent(ts)
+        self.open[session] = [fingerprint, 1, ts, ts, duration, parent]
+
+    def merge(self, other: "BurstTracker"):
+        """Append a later chunk's sessions, joining runs that straddle the boundary."""
+        for session in {**other.heads, **other.open}:
+            their_open = other.open.get(session)
+            head = other.heads.get(session)
+            if head is None and their_open is not None and their_open[5] is self.UNKNOWN:
+                head = their_open
+            mine = self.open.pop(session, None)
+            if head is None:
+                if mine is not None:
+                    self._close(session, mine)
+                self.open[session] = their_open
+                continue
+            if mine is not None and self._continues(mine, head[0], head[2]):
+                joined = [head[0], mine[1] + head[1], mine[2], head[3], mine[4] + head[4], mine[5]]
+            else:
+                if mine is not None:
+                    self._close(session, mine)
+                joined = list(head)
+                if mine is not None and self._follows(mine, head[2]):
+                    joined[5] = mine[0]
+                else:
+                    joined[5] = self._first_parent(head[2])
+            if head is their_open:
+                self.open[session] = joined
+            else:
+                self._close(session, joined)
+                if their_open is not None:
+                    self.open[session] = their_open
+        if self.start_ts is None:
+            self.start_ts = other.start_ts
+        if other.clock is not None and (self.clock is None or other.clock > self.clock):
+            self.clock = other.clock
+        if self.clock is not None:
+            self.expire(self.clock)
+        for key, theirs in other.bursts.items():
+            agg = self.bursts.get(key)
+            if agg is None:
+                self.bursts[key] = dict(theirs)
+                continue
+            agg["bursts"] += theirs["bursts"]
+            agg["queries"] += theirs["queries"]
+            agg["max_size"] = max(agg["max_size"], theirs["max_size"])
+            agg["total_ms"] += theirs["total_ms"]
+
+    def report(self, top_n: int) -> list[dict]:
+        """Bursts so far, counting runs still open, ranked by time spent inside them."""
+        bursts = {key: dict(agg) for key, agg in self.bursts.items()}
+        for run in (*self.heads.values(), *self.open.values()):
+            self._record(bursts, run)
+        ranked = heapq.nlargest(top_n, bursts.items(), key=lambda item: item[1]["total_ms"])
+        return [
+            {
+                "statement": fingerprint,
+                "parent": parent,
+                "bursts": agg["bursts"],
+                "queries": agg["queries"],
+                "avg_size": round(agg["queries"] / agg["bursts"], 1),
+                "max_size": agg["max_size"],
+                "total_ms": round(agg["total_ms"], 3),
+            }
+            for (parent, fingerprint), agg in ranked
+        ]
+
+
+class QueryStats:
+    """Streaming aggregates over parsed statements.
+
+    Each statement is fingerprinted as it arrives and folded into
+    per-fingerprint counters; only the slowest ``top_n`` raw statements are
+    kept, in a min-heap. Memory grows with the number of distinct query
+    shapes and of recently active sessions, not with log size.
+    """
+
+    def __init__(self, threshold_ms: float, top_n: int = SLOWEST_N,
+                 burst_window_s: float = BURST_WINDOW_S, burst_min: int = 5):
+        self.threshold_ms = threshold_ms
+        self.top_n = top_n
+        self.bursts = BurstTracker(burst_window_s, burst_min)
+        self.total_statements = 0
+        self.slow_query_count = 0
+        self.fingerprints: dict[str, dict] = {}
+        # (duration, -seq, statement): among equal durations the earliest statement survives.
+        self._slowest: list[tuple[float, int, str]] = []
+        self._seq = 0
+        # Split statement/duration records cut by a chunk boundary (see LogRecordAssembler).
+        self.pending: dict["str | None", tuple[str, "float | None"]] = {}
+        self.orphans: dict["str | None", tuple[float, "float | None"]] = {}
+        self.seen: dict["str | None", "float | None"] = {}
+        self.plans: dict[str, dict] = {}
+
+    def add(self, duration: float, sql: str, session: "str | None" = None, ts: "float | None" = None,
+            plan: "dict | None" = None):
+        if plan is not None:
+            self.add_plan(duration, sql, plan)
+            return
+        self.total_statements += 1
+        fingerprint = normalize_sql(sql)
+        if session is not None or ts is not None:
+            # Without a session or log time, back-to-back lines say nothing about a loop.
+            self.bursts.observe(session, ts, fingerprint, duration)
+        agg = self.fingerprints.get(fingerprint)
+        if agg is None:
+            agg = self.fingerprints[fingerprint] = {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "histogram": LatencyHistogram()
+            }
+        agg["count"] += 1
+        agg["total_ms"] += duration
+        if duration > agg["max_ms"]:
+            agg["max_ms"] = duration
+        agg["histogram"].add(duration)
+
+        if duration >= self.threshold_ms:
+            self.slow_query_count += 1
+            self._seq += 1
+            entry = (duration, -self._seq, sql)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def add_plan(self, duration: float, sql: str, plan: dict):
+        """Record auto_explain findings for a statement's fingerprint.
+
+        Plans are kept apart from statement counts: with log_min_duration_statement
+        also on, the same execution is logged twice.
+        """
+        fingerprint = normalize_sql(sql)
+        agg = self.plans.get(fingerprint)
+        if agg is None:
+            agg = self.plans[fingerprint] = {"plans": 0, "total_ms": 0.0, "issues": {}, "details": {}, "indexes": {}}
+        agg["plans"] += 1
+        agg["total_ms"] += duration
+        for issue, detail, suggestion in analyze_plan(plan):
+            agg["issues"][issue] = agg["issues"].get(issue, 0) + 1
+            if detail in agg["details"] or len(agg["details"]) < PLAN_DETAILS_N:
+                agg["details"][detail] = agg["details"].get(detail, 0) + 1
+            if suggestion:
+                agg["indexes"][suggestion] = agg["indexes"].get(suggestion, 0) + 1
+
+    def plan_findings(self) -> list[dict]:
+        """Fingerprints whose plans tripped a check, ranked by time spent in those plans."""
+        flagged = [(fingerprint, agg) for fingerprint, agg in self.plans.items() if agg["issues"]]
+        ranked = heapq.nlargest(self.top_n, flagged, key=lambda item: item[1]["total_ms"])
+        return [
+            {
+                "statement": fingerprint,
+                "plans": agg["plans"],
+                "total_ms": round(agg["total_ms"], 3),
+                "issues": dict(sorted(agg["issues"].items())),
+                "details": sorted(agg["details"], key=agg["details"].get, reverse=True),
+                "suggested_indexes": sorted(agg["indexes"], key=agg["indexes"].get, reverse=True),
+            }
+            for fingerprint, agg in ranked
+        ]
+
+    def merge(self, other: "QueryStats"):
+        """Fold in aggregates from a later chunk, as if its lines had followed ours."""
+        for session, (duration, ts) in other.orphans.items():
+            waiting = self.pending.pop(session, None)
+            if waiting is not None and within_session_idle(waiting[1], ts):
+                self.add(duration, waiting[0], session, ts)
+        self.total_statements += other.total_statements
+        self.slow_query_count += other.slow_query_count
+        for fingerprint, theirs in other.fingerprints.items():
+            agg = self.fingerprints.get(fingerprint)
+            if agg is None:
+                # Copy, so merging rolling buckets into a snapshot never mutates a bucket.
+                agg = self.fingerprints[fingerprint] = {
+                    "count": 0, "total_ms": 0.0, "max_ms": 0.0, "histogram": LatencyHistogram()
+                }
+            agg["count"] += theirs["count"]
+            agg["total_ms"] += theirs["total_ms"]
+            agg["max_ms"] = max(agg["max_ms"], theirs["max_ms"])
+            agg["histogram"].merge(theirs["histogram"])
+        for duration, neg_seq, sql in other._slowest:
+            entry = (duration, neg_seq - self._seq, sql)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+        self._seq += other._seq
+        self.bursts.merge(other.bursts)
+        for fingerprint, theirs in other.plans.items():
+            agg = self.plans.setdefault(fingerprint, {"plans": 0, "total_ms": 0.0, "issues": {}, "details": {},
+                                                      "indexes": {}})
+            agg["plans"] += theirs["plans"]
+            agg["total_ms"] += theirs["total_ms"]
+            for key in ("issues", "indexes"):
+                for name, count in theirs[key].items():
+                    agg[key][name] = agg[key].get(name, 0) + count
+            for detail, count in theirs["details"].items():
+                if detail in agg["details"] or len(agg["details"]) < PLAN_DETAILS_N:
+                    agg["details"][detail] = agg["details"].get(detail, 0) + count
+        # A session active in the later chunk has moved on; its older statement can no longer pair.
+        for session in other.seen:
+            self.pending.pop(session, None)
+        self.pending.update(other.pending)
+        self.seen.update(other.seen)
+        latest = max((ts for ts in other.seen.values() if ts is not None), default=None)
+        if latest is not None:
+            forget_idle_sessions(self.seen, self.pending, latest)
+
+    def top_by_total_time(self, total_time: float) -> list[dict]:
+        """The ``top_n`` fingerprints that consumed the most database time, with latency quantiles."""
+        ranked = heapq.nlargest(self.top_n, self.fingerprints.items(), key=lambda item: item[1]["total_ms"])
+        rows = []
+        for fingerprint, agg in ranked:
+            histogram = agg["histogram"]
+            # Quantiles are bucket midpoints, so clamp them to the exact max.
+            p50, p95, p99 = (min(histogram.quantile(q), agg["max_ms"]) for q in (0.5, 0.95, 0.99))
+            rows.append({
+                "statement": fingerprint,
+                "calls": agg["count"],
+                "total_ms": round(agg["total_ms"], 3),
+                "total_pct": round(100.0 * agg["total_ms"] / total_time, 2) if total_time else 0.0,
+                "mean_ms": round(agg["total_ms"] / agg["count"], 3),
+                "p50_ms": round(p50, 3),
+                "p95_ms": round(p95, 3),
+                "p99_ms": round(p99, 3),
+                "max_ms": agg["max_ms"],
+            })
+        return rows
+
+    def summary(self, n1_threshold: int) -> dict:
+        n_plus_one_candidates = [
+            {"statement": fingerprint, "count": agg["count"]}
+            for fingerprint, agg in self.fingerprints.items()
+            if agg["count"] >= n1_threshold and "select" in fingerprint
+        ]
+        n_plus_one_candidates.sort(key=lambda item: item["count"], reverse=True)
+        slowest = sorted(self._slowest, reverse=True)
+        total_time = sum(agg["total_ms"] for agg in self.fingerprints.values())
+        return {
+            "total_statements": self.total_statements,
+            "total_time_ms": round(total_time, 3),
+            "slow_query_threshold_ms": self.threshold_ms,
+            "slow_query_count": self.slow_query_count,
+            "top_by_total_time": self.top_by_total_time(total_time),
+            "slowest_queries": [{"duration_ms": d, "statement": sql} for d, _, sql in slowest],
+            "n_plus_one_candidates": n_plus_one_candidates[:20],
+            "n_plus_one_bursts": self.bursts.report(self.top_n),
+            "plan_findings": self.plan_findings(),
+        }
+
+
+def expand_log_paths(patterns: list[str]) -> list[str]:
+    """Resolve files, directories of rotated logs and glob patterns, in a stable order."""
+    paths: list[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(str(p) for p in sorted(Path(pattern).iterdir()) if p.is_file())
+        elif glob.has_magic(pattern):
+            paths.extend(p for p in sorted(glob.glob(pattern)) if os.path.isfile(p))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def plan_chunks(paths: list[str], chunk_bytes: int) -> list[tuple[str, int, "int | None"]]:
+    """Split plain files into byte ranges; gzip streams can't be seeked, so they stay whole."""
+    tasks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if path.endswith(".gz") or size <= chunk_bytes:
+            tasks.append((path, 0, None))
+            continue
+        tasks.extend((path, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes))
+    return tasks
+
+
+def iter_log_lines(path: str, start: int = 0, end: "int | None" = None):
+    """Yield the lines of the log records that begin inside ``[start, end)``.
+
+    Plain files are read through mmap so chunks can be handed to separate
+    workers. ``start`` and ``end`` are moved forward to the next record start,
+    i.e. a line not indented as a continuation, so every multi-line record
+    belongs to exactly one chunk.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8", errors="ignore") as handle:
+            yield from handle
+        return
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        end = size if end is None else end
+        if start > 0:
+            newline = mm.find(b"\n", start - 1)
+            start = size if newline < 0 else newline + 1
+            while start < size and mm[start:start + 1] in (b" ", b"\t"):
+                newline = mm.find(b"\n", start)
+                start = size if newline < 0 else newline + 1
+        mm.seek(start)
+        while True:
+            position = mm.tell()
+            if position >= size or (position >= end and mm[position:position + 1] not in (b" ", b"\t")):
+                break
+            yield mm.readline().decode("utf-8", errors="ignore")
+
+
+def scan_chunk(task: tuple[str, int, "int | None"], threshold_ms: float, top_n: int,
+               line_prefix: str = LOG_LINE_PREFIX, burst_window_s: float = BURST_WINDOW_S,
+               burst_min: int = 5) -> QueryStats:
+    path, start, end = task
+    stats = QueryStats(threshold_ms, top_n, burst_window_s, burst_min)
+    assembler = LogRecordAssembler(line_prefix)
+    for line in iter_log_lines(path, start, end):
+        for record in assembler.feed(line):
+            stats.add(*record)
+    for record in assembler.close():
+        stats.add(*record)
+    stats.pending = assembler.pending
+    stats.orphans = assembler.orphans
+    stats.seen = assembler.seen
+    return stats
+
+
+def analyze(log_files: list[str], threshold_ms: float, n1_threshold: int, top_n: int = SLOWEST_N,
+            jobs: int = 1, chunk_mb: float = CHUNK_MB, line_prefix: str = LOG_LINE_PREFIX,
+            burst_window_s: float = BURST_WINDOW_S):
+    tasks = plan_chunks(expand_log_paths(log_files), max(1, int(chunk_mb * 1024 * 1024)))
+    worker = partial(scan_chunk, threshold_ms=threshold_ms, top_n=top_n, line_prefix=line_prefix,
+                     burst_window_s=burst_window_s, burst_min=n1_threshold)
+    stats = QueryStats(threshold_ms, top_n, burst_window_s, n1_threshold)
+
+    if jobs <= 1 or len(tasks) < 2:
+        for task in tasks:
+            stats.merge(worker(task))
+    else:
+        # map() yields in task order, so merged results match a serial run.
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for chunk_stats in executor.map(worker, tasks):
+                stats.merge(chunk_stats)
+
+    return stats.summary(n1_threshold)
+
+
+class LogFollower:
+    """Tail a growing log file, surviving rotation and truncation.
+
+    Rotation (the path now names a different inode) drains the old handle and
+    continues from the start of the new file; truncation in place
+    (``copytruncate``) rewinds to the start. Incomplete trailing lines are
+    held back until their newline arrives.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = None
+        self._inode = None
+        self._partial = b""
+        self._open(seek_end=True)
+
+    def _open(self, seek_end: bool):
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        stat = os.fstat(handle.fileno())
+        self._inode = (stat.st_dev, stat.st_ino)
+        if seek_end:
+            handle.seek(0, os.SEEK_END)
+        self._handle = handle
+        self._partial = b""
+
+    def _drain(self) -> list[str]:
+        data = self._handle.read(FOLLOW_READ_BYTES)
+        if not data:
+            return []
+        *complete, self._partial = (self._partial + data).split(b"\n")
+        return [line.decode("utf-8", errors="ignore") for line in complete]
+
+    def read_lines(self) -> list[str]:
+        """Complete lines appended since the last call (bounded by FOLLOW_READ_BYTES)."""
+        if self._handle is None:
+            self._open(seek_end=False)
+            if self._handle is None:
+                return []
+        lines = self._drain()
+        if lines:
+            return lines
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return lines  # rotated away, replacement not created yet
+        if (stat.st_dev, stat.st_ino) != self._inode:
+            self._handle.close()
+            self._handle = None
+            self._open(seek_end=False)
+            return self._drain() if self._handle else []
+        if stat.st_size < self._handle.tell():
+            self._handle.seek(0)
+            self._partial = b""
+            return self._drain()
+        return lines
+
+
+class FollowSession:
+    """Rolling aggregates over the last ``window_s`` seconds of a live log.
+
+    Statements land in per-interval ``QueryStats`` buckets stamped with the
+    wall-clock time they were read; a snapshot merges the buckets still
+    inside the window, so old traffic ages out without re-reading anything.
+    One assembler spans all buckets, so records and split statement/duration
+    pairs are never cut by a bucket boundary.
+    """
+
+    def __init__(self, path: str, threshold_ms: float, n1_threshold: int, top_n: int = SLOWEST_N,
+                 line_prefix: str = LOG_LINE_PREFIX, burst_window_s: float = BURST_WINDOW_S,
+                 window_s: float = FOLLOW_WINDOW_S, interval_s: float = FOLLOW_INTERVAL_S):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.n1_threshold = n1_threshold
+        self.top_n = top_n
+        self.burst_window_s = burst_window_s
+        self.window_s = window_s
+        self.interval_s = interval_s
+        self.follower = LogFollower(path)
+        self.assembler = LogRecordAssembler(line_prefix)
+        self.buckets: deque[tuple[float, QueryStats]] = deque()
+
+    def _new_stats(self) -> QueryStats:
+        return QueryStats(self.threshold_ms, self.top_n, self.burst_window_s, self.n1_threshold)
+
+    def _bucket(self, now: float) -> QueryStats:
+        start = now - now % self.interval_s
+        if not self.buckets or self.buckets[-1][0] != start:
+            self.buckets.append((start, self._new_stats()))
+        while self.buckets[0][0] + self.interval_s <= now - self.window_s:
+            self.buckets.popleft()
+        return self.buckets[-1][1]
+
+    def poll(self, now: float) -> int:
+        """Ingest whatever was appended since the last poll; return the number of lines read."""
+        lines = self.follower.read_lines()
+        bucket = self._bucket(now)
+        for line in lines:
+            for record in self.assembler.feed(line):
+                bucket.add(*record)
+        if not lines:
+            # Quiet log: the last record is complete.
+            for record in self.assembler.close():
+                bucket.add(*record)
+        return len(lines)
+
+    def snapshot(self, now: float) -> dict:
+        stats = self._new_stats()
+        for _, bucket in self.buckets:
+            stats.merge(bucket)
+        return {
+            "generated_at": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+            "log_file": self.path,
+            "window_s": self.window_s,
+            **stats.summary(self.n1_threshold),
+        }
+
+    def run(self, snapshot_file: "str | None", as_json: bool):
+        if snapshot_file:
+            print(f"\n👀 Following {self.path}, snapshot every {self.interval_s:g}s "
+                  f"to {snapshot_file} (Ctrl+C to stop)...")
+        next_snapshot = time.time() + self.interval_s
+        try:
+            while True:
+                now = time.time()
+                if not self.poll(now):
+                    time.sleep(FOLLOW_POLL_S)
+                if now < next_snapshot:
+                    continue
+                next_snapshot = now + self.interval_s
+                summary = self.snapshot(now)
+                if snapshot_file:
+                    write_snapshot(snapshot_file, summary)
+                    print(f"[{time.strftime('%H:%M:%S')}] {summary['total_statements']} statements "
+                          f"in the last {self.window_s:g}s, {summary['slow_query_count']} slow")
+                elif as_json:
+                    print(json.dumps(summary), flush=True)
+                else:
+                    print()
+                    print_report(summary)
+        except KeyboardInterrupt:
+            print("\nStopped following.")
+
+
+def write_snapshot(path: str, summary: dict):
+    """Replace ``path`` atomically so readers never see a half-written snapshot."""
+    target = Path(path)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def print_report(summary):
     print("📈 Slow Query Analyzer")
     print(f"Total parsed statements: {summary['total_statements']}")
+    print(f"Total database time: {summary['total_time_ms']:.2f}ms")
     print(f"Slow query count (>= {summary['slow_query_threshold_ms']}ms): {summary['slow_query_count']}")
 
+    if summary["top_by_total_time"]:
+        print("\nTop query shapes by total time:")
+        for item in summary["top_by_total_time"][:5]:
+            print(f" - {item['total_pct']:5.1f}% | {item['total_ms']:.2f}ms over {item['calls']} calls"
+                  f" | p50 {item['p50_ms']:.2f} p95 {item['p95_ms']:.2f} p99 {item['p99_ms']:.2f}"
+                  f" max {item['max_ms']:.2f}ms | {item['statement']}")
+
     if summary["slowest_queries"]:
         print("\nTop slow queries:")
         for item in summary["slowest_queries"][:5]:
-            print(f" - {item['duration_ms']:.2f}ms | {item['statement']}")
+            print(f" - {item['duration_ms']:.2f}ms | {WHITESPACE_RE.sub(' ', item['statement'])}")
     else:
         print("\nNo slow queries above threshold were found.")
 
@@ -75,16 +1002,64 @@ def print_report(summary):
     else:
         print("\nNo high-frequency SELECT patterns matched the N+1 threshold.")
 
+    if summary["n_plus_one_bursts"]:
+        print("\nN+1 bursts (same SELECT repeated back-to-back in one session):")
+        for item in summary["n_plus_one_bursts"][:5]:
+            print(f" - {item['bursts']} bursts, avg {item['avg_size']} / max {item['max_size']} queries,"
+                  f" {item['total_ms']:.2f}ms | {item['statement']}")
+            if item["parent"]:
+                print(f"   after: {item['parent']}")
+
+    if summary["plan_findings"]:
+        print("\n🔎 auto_explain plan findings:")
+        for item in summary["plan_findings"][:5]:
+            issues = ", ".join(f"{name} x{count}" for name, count in item["issues"].items())
+            print(f" - {item['plans']} plans, {item['total_ms']:.2f}ms | {issues} | {item['statement']}")
+            for detail in item["details"][:3]:
+                print(f"     {detail}")
+            for sql in item["suggested_indexes"][:2]:
+                print(f"   💡 {sql}")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze SQL logs for slow queries and N+1 patterns.")
-    parser.add_argument("--log-file", required=True, help="Path to SQL log file")
+    parser.add_argument("--log-file", required=True, nargs="+",
+                        help="SQL log files, directories of rotated logs or glob patterns (.gz supported)")
     parser.add_argument("--threshold", default=500.0, type=float, help="Slow query threshold in ms")
-    parser.add_argument("--n-plus-one-threshold", default=5, type=int, help="Min repetition count for N+1 detection")
+    parser.add_argument("--n-plus-one-threshold", default=5, type=int,
+                        help="Min repetition count for N+1 detection, globally and per burst")
+    parser.add_argument("--burst-window", default=BURST_WINDOW_S, type=float,
+                        help=f"Max seconds between repeats of a query in one session to count as a burst "
+                             f"(default: {BURST_WINDOW_S})")
+    parser.add_argument("--top", default=SLOWEST_N, type=int, help="Number of slowest statements to keep")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for chunked parsing (0 = all cores, default: 1)")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_MB,
+                        help=f"Split plain log files into chunks of this size (default: {CHUNK_MB})")
+    parser.add_argument("--log-line-prefix", default=LOG_LINE_PREFIX,
+                        help=f"PostgreSQL log_line_prefix used to find record starts (default: {LOG_LINE_PREFIX!r})")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail a single live log (rotation/truncation aware) and report rolling aggregates")
+    parser.add_argument("--window", type=float, default=FOLLOW_WINDOW_S,
+                        help=f"Rolling window in seconds for --follow (default: {FOLLOW_WINDOW_S:g})")
+    parser.add_argument("--snapshot-interval", type=float, default=FOLLOW_INTERVAL_S,
+                        help=f"Seconds between --follow snapshots (default: {FOLLOW_INTERVAL_S:g})")
+    parser.add_argument("--snapshot-file", default=None,
+                        help="With --follow, atomically rewrite this JSON file at each snapshot instead of printing")
     parser.add_argument("--json", action="store_true", help="Output report as JSON")
     args = parser.parse_args()
 
-    summary = analyze(args.log_file, args.threshold, args.n_plus_one_threshold)
+    if args.follow:
+        if len(args.log_file) != 1 or glob.has_magic(args.log_file[0]) or os.path.isdir(args.log_file[0]):
+            parser.error("--follow takes exactly one log file")
+        FollowSession(args.log_file[0], args.threshold, args.n_plus_one_threshold, args.top,
+                      args.log_line_prefix, args.burst_window, args.window,
+                      args.snapshot_interval).run(args.snapshot_file, args.json)
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    summary = analyze(args.log_file, args.threshold, args.n_plus_one_threshold, args.top, jobs, args.chunk_mb,
+                      args.log_line_prefix, args.burst_window)
     if args.json:
         print(json.dumps(summary, indent=2))
         return